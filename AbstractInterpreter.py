@@ -1,9 +1,18 @@
 from __future__ import annotations
-from load_class_files import load_class_files
-from typing import List, Dict, Union, Tuple, Set
-from enum import Enum
-from copy import deepcopy
-import json
+from load_class_files import index_class_files, index_json_files, read_json
+from tracing import TraceLevel, Tracer
+from difference_bound_matrix import DifferenceBoundMatrix
+from collections.abc import Mapping
+from typing import List, Dict, Union, Tuple, Set, Callable, Iterator, BinaryIO
+from enum import Enum, IntEnum
+from collections import OrderedDict, deque
+from array import array
+import heapq
+import os
+import pickle
+import struct
+import sys
+import tempfile
 
 JSON_CONTENT = Dict[str, Union[str, List[Union[str, Dict]], Dict]]
 
@@ -11,269 +20,871 @@ JSON_CONTENT = Dict[str, Union[str, List[Union[str, Dict]], Dict]]
 class AbstractMode(Enum):
     ANY_INT = "Any Int"
     SIGN = "Sign"
+    INTERVAL = "Interval"
+    # intervals and the differences between the local variables
+    RELATIONAL = "Relational"
 
 
 ABSTRACT_MODE = AbstractMode.SIGN
+# the modes whose variables are intervals
+INTERVAL_MODE_SET = {AbstractMode.INTERVAL, AbstractMode.RELATIONAL}
+# fold the constant branches and drop the dead code when a method is loaded
+PRUNE_DEAD_CODE = True
+
+
+def get_type_descriptor(type_json: None | str | JSON_CONTENT) -> None | str:
+    """
+    the same name for a type in a method signature and in an invoke operation
+    """
+    if type_json is None or isinstance(type_json, str):
+        return type_json
+    if "base" in type_json:
+        return type_json["base"]
+    if type_json.get("kind") == "array":
+        return f"{get_type_descriptor(type_json['type'])}[]"
+    return type_json.get("name")
+
+
+def is_case_method(method_json: JSON_CONTENT) -> bool:
+    return any(
+        annotation_json["type"] == "dtu/compute/exec/Case"
+        for annotation_json in method_json["annotations"]
+    )
 
 
 class JavaMethod:
-    def __init__(self, json_content: JSON_CONTENT) -> None:
-        self.json_content = json_content
-        self.id = self.json_content["name"]
+    """
+    only the parts of the method json the interpreter reads are kept
+    """
+
+    def __init__(self, json_content: JSON_CONTENT, class_id: None | str = None) -> None:
+        self.id: str = json_content["name"]
+        self.class_id = class_id
+        self.access: List[str] = json_content["access"]
+        self.param_types: List[JSON_CONTENT] = [
+            param_json["type"] for param_json in json_content["params"]
+        ]
         self.bytecode_json: List[JSON_CONTENT] = json_content["code"]["bytecode"]
+        self.instructions: List[Instruction] = [
+            Instruction(operation_json) for operation_json in self.bytecode_json
+        ]
+        if PRUNE_DEAD_CODE:
+            self.instructions = prune_instructions(self.instructions)
+        find_relations(self.instructions)
+        # the local variable slots the method uses
+        self.local_count = len(self.param_types)
+        for instruction in self.instructions:
+            if instruction.opcode in (Opcode.LOAD, Opcode.STORE, Opcode.INCR):
+                self.local_count = max(self.local_count, instruction.index + 1)
+        self.control_flow_graph = ControlFlowGraph(self)
+
+    def get_init_parameters(self) -> List[AbstractVariable]:
+        """
+        any int for every parameter, only int-like parameters of static methods
+        are supported
+        """
+        if "static" not in self.access:
+            raise Exception(self.access)
+        init_parameters: List[AbstractVariable] = []
+        for param_type in self.param_types:
+            match param_type.get("base"):
+                case "int" | "boolean" | "byte" | "short" | "char":
+                    init_parameters.append(AbstractVariable(AbstractType.ANY_INT))
+
+                case _:
+                    raise Exception(param_type)
+        return init_parameters
+
+    def get_arg_types(self) -> Tuple[None | str, ...]:
+        return tuple(get_type_descriptor(x) for x in self.param_types)
 
 
 class JavaClass:
-    def __init__(self, json_str: str) -> None:
-        self.json_content: JSON_CONTENT = json.loads(json_str)
-        self.id = self.json_content["name"]
+    """
+    the methods of a class, the rest of the class json is dropped after loading
+    """
+
+    def __init__(self, json_content: JSON_CONTENT) -> None:
+        self.id: str = json_content["name"]
 
         self.method_dict: Dict[str, JavaMethod] = {}
-        for method_json in self.json_content["methods"]:
+        # the trimmed json of every method with code, in case it is invoked
+        self.method_json_list: List[JSON_CONTENT] = []
+        for method_json in json_content["methods"]:
+            if method_json["code"] is None:
+                continue
+            self.method_json_list.append(
+                {
+                    "name": method_json["name"],
+                    "access": method_json["access"],
+                    "params": [{"type": x["type"]} for x in method_json["params"]],
+                    "code": {"bytecode": method_json["code"]["bytecode"]},
+                }
+            )
             # only handle method with "@Case"
-            annotations_json: List[JSON_CONTENT] = method_json["annotations"]
-            for annotation_json in annotations_json:
-                if annotation_json["type"] == "dtu/compute/exec/Case":
-                    java_method = JavaMethod(method_json)
-                    self.method_dict[java_method.id] = java_method
-                    break
+            if is_case_method(method_json):
+                java_method = JavaMethod(method_json, self.id)
+                self.method_dict[java_method.id] = java_method
+
+        # every method which may be invoked, built when first invoked
+        self.invoked_method_dict: Dict[
+            Tuple[str, Tuple[None | str, ...]], JavaMethod
+        ] = {}
+
+    def get_method(
+        self, method_name: str, arg_types: Tuple[None | str, ...]
+    ) -> JavaMethod:
+        """
+        the method with the name and the argument types
+        """
+        key = (method_name, arg_types)
+        java_method = self.invoked_method_dict.get(key)
+        if java_method is not None:
+            return java_method
+        for method_json in self.method_json_list:
+            if method_json["name"] != method_name:
+                continue
+            java_method = self.method_dict.get(method_name)
+            if (
+                java_method is None
+                or java_method.bytecode_json is not method_json["code"]["bytecode"]
+            ):
+                java_method = JavaMethod(method_json, self.id)
+            if java_method.get_arg_types() == arg_types:
+                self.invoked_method_dict[key] = java_method
+                return java_method
+        raise Exception(f"{self.id}.{method_name}")
 
 
 class AbstractType(Enum):
     INT = "Int"
     VOID = "Void"
+    BOTTOM = "Bottom"  # no int value, e.g. the result of dividing by zero
     ANY_INT = "Any Int"  # any int value
     POSITIVE_INT = "Positive Int"  # positive int
     NEGATIVE_INT = "Negative Int"  # negative int
     NOT_POSITIVE_INT = "Not Positive Int"  # not positive int
     NOT_NEGATIVE_INT = "Not Negative Int"  # not negative int
     NOT_ZERO = "Not Zero"  # not zero
+    INTERVAL = "Interval"  # int in an interval
+
+
+# the sign domain is a bitmask of the signs a variable may take
+NEGATIVE_BIT = 1
+ZERO_BIT = 2
+POSITIVE_BIT = 4
+ALL_BITS = NEGATIVE_BIT | ZERO_BIT | POSITIVE_BIT
+
+TYPE_MASK_DICT: Dict[AbstractType, int] = {
+    AbstractType.VOID: 0,
+    AbstractType.BOTTOM: 0,
+    AbstractType.ANY_INT: ALL_BITS,
+    AbstractType.POSITIVE_INT: POSITIVE_BIT,
+    AbstractType.NEGATIVE_INT: NEGATIVE_BIT,
+    AbstractType.NOT_POSITIVE_INT: NEGATIVE_BIT | ZERO_BIT,
+    AbstractType.NOT_NEGATIVE_INT: ZERO_BIT | POSITIVE_BIT,
+    AbstractType.NOT_ZERO: NEGATIVE_BIT | POSITIVE_BIT,
+}
+
+# the abstract type of each mask, the zero mask is the int 0
+MASK_TYPE_LIST: List[AbstractType | int] = [
+    AbstractType.BOTTOM,
+    AbstractType.NEGATIVE_INT,
+    0,
+    AbstractType.NOT_POSITIVE_INT,
+    AbstractType.POSITIVE_INT,
+    AbstractType.NOT_ZERO,
+    AbstractType.NOT_NEGATIVE_INT,
+    AbstractType.ANY_INT,
+]
+
+SIGN_BITS = (NEGATIVE_BIT, ZERO_BIT, POSITIVE_BIT)
+
+# the signs of `a opr b` for a single sign of a and b
+SIGN_OPERATION_DICT: Dict[str, Dict[Tuple[int, int], int]] = {
+    "add": {
+        (NEGATIVE_BIT, NEGATIVE_BIT): NEGATIVE_BIT,
+        (NEGATIVE_BIT, ZERO_BIT): NEGATIVE_BIT,
+        (NEGATIVE_BIT, POSITIVE_BIT): ALL_BITS,
+        (ZERO_BIT, NEGATIVE_BIT): NEGATIVE_BIT,
+        (ZERO_BIT, ZERO_BIT): ZERO_BIT,
+        (ZERO_BIT, POSITIVE_BIT): POSITIVE_BIT,
+        (POSITIVE_BIT, NEGATIVE_BIT): ALL_BITS,
+        (POSITIVE_BIT, ZERO_BIT): POSITIVE_BIT,
+        (POSITIVE_BIT, POSITIVE_BIT): POSITIVE_BIT,
+    },
+    "sub": {
+        (NEGATIVE_BIT, NEGATIVE_BIT): ALL_BITS,
+        (NEGATIVE_BIT, ZERO_BIT): NEGATIVE_BIT,
+        (NEGATIVE_BIT, POSITIVE_BIT): NEGATIVE_BIT,
+        (ZERO_BIT, NEGATIVE_BIT): POSITIVE_BIT,
+        (ZERO_BIT, ZERO_BIT): ZERO_BIT,
+        (ZERO_BIT, POSITIVE_BIT): NEGATIVE_BIT,
+        (POSITIVE_BIT, NEGATIVE_BIT): POSITIVE_BIT,
+        (POSITIVE_BIT, ZERO_BIT): POSITIVE_BIT,
+        (POSITIVE_BIT, POSITIVE_BIT): ALL_BITS,
+    },
+    "mul": {
+        (NEGATIVE_BIT, NEGATIVE_BIT): POSITIVE_BIT,
+        (NEGATIVE_BIT, ZERO_BIT): ZERO_BIT,
+        (NEGATIVE_BIT, POSITIVE_BIT): NEGATIVE_BIT,
+        (ZERO_BIT, NEGATIVE_BIT): ZERO_BIT,
+        (ZERO_BIT, ZERO_BIT): ZERO_BIT,
+        (ZERO_BIT, POSITIVE_BIT): ZERO_BIT,
+        (POSITIVE_BIT, NEGATIVE_BIT): NEGATIVE_BIT,
+        (POSITIVE_BIT, ZERO_BIT): ZERO_BIT,
+        (POSITIVE_BIT, POSITIVE_BIT): POSITIVE_BIT,
+    },
+    # the int division rounds toward zero, dividing by zero has no result
+    "div": {
+        (NEGATIVE_BIT, NEGATIVE_BIT): ZERO_BIT | POSITIVE_BIT,
+        (NEGATIVE_BIT, ZERO_BIT): 0,
+        (NEGATIVE_BIT, POSITIVE_BIT): NEGATIVE_BIT | ZERO_BIT,
+        (ZERO_BIT, NEGATIVE_BIT): ZERO_BIT,
+        (ZERO_BIT, ZERO_BIT): 0,
+        (ZERO_BIT, POSITIVE_BIT): ZERO_BIT,
+        (POSITIVE_BIT, NEGATIVE_BIT): NEGATIVE_BIT | ZERO_BIT,
+        (POSITIVE_BIT, ZERO_BIT): 0,
+        (POSITIVE_BIT, POSITIVE_BIT): ZERO_BIT | POSITIVE_BIT,
+    },
+    # the remainder takes the sign of the dividend
+    "rem": {
+        (NEGATIVE_BIT, NEGATIVE_BIT): NEGATIVE_BIT | ZERO_BIT,
+        (NEGATIVE_BIT, ZERO_BIT): 0,
+        (NEGATIVE_BIT, POSITIVE_BIT): NEGATIVE_BIT | ZERO_BIT,
+        (ZERO_BIT, NEGATIVE_BIT): ZERO_BIT,
+        (ZERO_BIT, ZERO_BIT): 0,
+        (ZERO_BIT, POSITIVE_BIT): ZERO_BIT,
+        (POSITIVE_BIT, NEGATIVE_BIT): ZERO_BIT | POSITIVE_BIT,
+        (POSITIVE_BIT, ZERO_BIT): 0,
+        (POSITIVE_BIT, POSITIVE_BIT): ZERO_BIT | POSITIVE_BIT,
+    },
+}
+
+# the possible results of `a condition b` for a single sign of a and b
+SIGN_ORDER_DICT: Dict[Tuple[int, int], Set[str]] = {
+    (NEGATIVE_BIT, NEGATIVE_BIT): {"lt", "eq", "gt"},
+    (NEGATIVE_BIT, ZERO_BIT): {"lt"},
+    (NEGATIVE_BIT, POSITIVE_BIT): {"lt"},
+    (ZERO_BIT, NEGATIVE_BIT): {"gt"},
+    (ZERO_BIT, ZERO_BIT): {"eq"},
+    (ZERO_BIT, POSITIVE_BIT): {"lt"},
+    (POSITIVE_BIT, NEGATIVE_BIT): {"gt"},
+    (POSITIVE_BIT, ZERO_BIT): {"gt"},
+    (POSITIVE_BIT, POSITIVE_BIT): {"lt", "eq", "gt"},
+}
+
+# the orders which make each condition true
+CONDITION_ORDER_DICT: Dict[str, Set[str]] = {
+    "gt": {"gt"},
+    "ge": {"gt", "eq"},
+    "lt": {"lt"},
+    "le": {"lt", "eq"},
+    "eq": {"eq"},
+    "ne": {"lt", "gt"},
+}
+
+
+def build_transfer_table(operation: str) -> List[int]:
+    """
+    the result mask of `a opr b`, indexed by `a.mask << 3 | b.mask`
+    """
+    table = [0] * 64
+    for mask_a in range(8):
+        for mask_b in range(8):
+            result = 0
+            for sign_a in SIGN_BITS:
+                for sign_b in SIGN_BITS:
+                    if sign_a & mask_a and sign_b & mask_b:
+                        result |= SIGN_OPERATION_DICT[operation][(sign_a, sign_b)]
+            table[mask_a << 3 | mask_b] = result
+    return table
+
+
+def build_refine_table(condition: str) -> List[Tuple[int, int, int, int]]:
+    """
+    the refined masks of a and b when `a condition b` is true and when it is false,
+    indexed by `a.mask << 3 | b.mask`
+    """
+    table: List[Tuple[int, int, int, int]] = []
+    for mask_a in range(8):
+        for mask_b in range(8):
+            true_a, true_b, false_a, false_b = 0, 0, 0, 0
+            for sign_a in SIGN_BITS:
+                for sign_b in SIGN_BITS:
+                    if not (sign_a & mask_a and sign_b & mask_b):
+                        continue
+                    order_set = SIGN_ORDER_DICT[(sign_a, sign_b)]
+                    if order_set & CONDITION_ORDER_DICT[condition]:
+                        true_a |= sign_a
+                        true_b |= sign_b
+                    if order_set - CONDITION_ORDER_DICT[condition]:
+                        false_a |= sign_a
+                        false_b |= sign_b
+            table.append((true_a, true_b, false_a, false_b))
+    return table
+
+
+TRANSFER_TABLE_DICT: Dict[str, List[int]] = {
+    operation: build_transfer_table(operation) for operation in SIGN_OPERATION_DICT
+}
+REFINE_TABLE_DICT: Dict[str, List[Tuple[int, int, int, int]]] = {
+    condition: build_refine_table(condition) for condition in CONDITION_ORDER_DICT
+}
+
+
+def wrap_int(value: int) -> int:
+    """
+    wrap the value to a 32 bits java int
+    """
+    return (value + 0x80000000) % 0x100000000 - 0x80000000
+
+
+def compute_int(a: int, operation: str, b: int) -> int:
+    """
+    the java semantics of the int operation, b is not zero for div and rem
+    """
+    match operation:
+        case "add":
+            return wrap_int(a + b)
+
+        case "sub":
+            return wrap_int(a - b)
+
+        case "mul":
+            return wrap_int(a * b)
+
+        case "div":
+            quotient = abs(a) // abs(b)
+            return wrap_int(quotient if (a < 0) == (b < 0) else -quotient)
+
+        case "rem":
+            remainder = abs(a) % abs(b)
+            return remainder if a >= 0 else -remainder
+
+        case _:
+            raise Exception(operation)
+
+
+def compare_int(a: int, condition: str, b: int) -> bool:
+    match condition:
+        case "gt":
+            return a > b
+
+        case "ge":
+            return a >= b
+
+        case "lt":
+            return a < b
+
+        case "le":
+            return a <= b
+
+        case "eq":
+            return a == b
+
+        case "ne":
+            return a != b
+
+        case _:
+            raise Exception(condition)
+
+
+# the interval domain works on flat (low, high) int pairs,
+# an empty interval has low > high
+INT_MIN = -0x80000000
+INT_MAX = 0x7FFFFFFF
+
+TYPE_BOUNDS_DICT: Dict[AbstractType, Tuple[int, int]] = {
+    AbstractType.VOID: (1, 0),
+    AbstractType.BOTTOM: (1, 0),
+    AbstractType.ANY_INT: (INT_MIN, INT_MAX),
+    AbstractType.POSITIVE_INT: (1, INT_MAX),
+    AbstractType.NEGATIVE_INT: (INT_MIN, -1),
+    AbstractType.NOT_POSITIVE_INT: (INT_MIN, 0),
+    AbstractType.NOT_NEGATIVE_INT: (0, INT_MAX),
+    AbstractType.NOT_ZERO: (INT_MIN, INT_MAX),
+}
+
+# the abstract types which are exactly an interval
+BOUNDS_TYPE_DICT: Dict[Tuple[int, int], AbstractType] = {
+    (INT_MIN, INT_MAX): AbstractType.ANY_INT,
+    (1, INT_MAX): AbstractType.POSITIVE_INT,
+    (INT_MIN, -1): AbstractType.NEGATIVE_INT,
+    (INT_MIN, 0): AbstractType.NOT_POSITIVE_INT,
+    (0, INT_MAX): AbstractType.NOT_NEGATIVE_INT,
+}
+
+
+def wrap_interval(low: int, high: int) -> Tuple[int, int]:
+    """
+    the java int interval of the exact result interval,
+    an overflow wraps around, so the interval may become the whole int range
+    """
+    if low >= INT_MIN and high <= INT_MAX:
+        return low, high
+    if high - low >= 0x100000000:
+        return INT_MIN, INT_MAX
+    wrapped_low, wrapped_high = wrap_int(low), wrap_int(high)
+    if wrapped_low > wrapped_high:
+        return INT_MIN, INT_MAX
+    return wrapped_low, wrapped_high
+
+
+def get_interval_mask(low: int, high: int) -> int:
+    """
+    the signs of the ints between low and high
+    """
+    mask = 0
+    if low > high:
+        return mask
+    if low < 0:
+        mask |= NEGATIVE_BIT
+    if low <= 0 <= high:
+        mask |= ZERO_BIT
+    if high > 0:
+        mask |= POSITIVE_BIT
+    return mask
+
+
+def get_wrapped_mask(low: int, high: int) -> int:
+    """
+    the signs of the java ints of the exact interval, which may overflow,
+    a wrapped interval is two pieces and zero may be in neither of them
+    """
+    if low > high:
+        return 0
+    if high - low >= 0x100000000:
+        return ALL_BITS
+    wrapped_low, wrapped_high = wrap_int(low), wrap_int(high)
+    if wrapped_low <= wrapped_high:
+        return get_interval_mask(wrapped_low, wrapped_high)
+    return get_interval_mask(wrapped_low, INT_MAX) | get_interval_mask(
+        INT_MIN, wrapped_high
+    )
+
+
+def divide_int(a: int, b: int) -> int:
+    """
+    the exact int division rounding toward zero, without overflow
+    """
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+
+def operate_exact_interval(
+    low_a: int, high_a: int, operation: str, low_b: int, high_b: int
+) -> Tuple[int, int]:
+    """
+    the interval of `a opr b` before it wraps around,
+    the zero divisor has no result
+    """
+    if low_a > high_a or low_b > high_b:
+        return 1, 0
+    match operation:
+        case "add":
+            return low_a + low_b, high_a + high_b
+
+        case "sub":
+            return low_a - high_b, high_a - low_b
+
+        case "mul":
+            products = (low_a * low_b, low_a * high_b, high_a * low_b, high_a * high_b)
+            return min(products), max(products)
+
+        case "div":
+            low, high = 1, 0
+            # divide by the negative and the positive part of b separately
+            for part_low, part_high in (
+                (low_b, min(high_b, -1)),
+                (max(low_b, 1), high_b),
+            ):
+                if part_low > part_high:
+                    continue
+                quotients = (
+                    divide_int(low_a, part_low),
+                    divide_int(low_a, part_high),
+                    divide_int(high_a, part_low),
+                    divide_int(high_a, part_high),
+                )
+                if low > high:
+                    low, high = min(quotients), max(quotients)
+                else:
+                    low, high = min(low, *quotients), max(high, *quotients)
+            return low, high
+
+        case "rem":
+            if low_b == 0 and high_b == 0:
+                return 1, 0
+            # the remainder is smaller than the divisor and has the sign of a
+            limit = max(abs(low_b), abs(high_b)) - 1
+            low = 0 if low_a >= 0 else max(low_a, -limit)
+            high = 0 if high_a <= 0 else min(high_a, limit)
+            return low, high
+
+        case _:
+            raise Exception(operation)
+
+
+def refine_interval(
+    low_a: int, high_a: int, condition: str, low_b: int, high_b: int
+) -> Tuple[Tuple[int, int, int, int], Tuple[int, int, int, int]]:
+    """
+    the refined intervals of a and b when `a condition b` is true and when it is false
+    """
+    match condition:
+        case "lt":
+            true_bounds = (
+                low_a,
+                min(high_a, high_b - 1),
+                max(low_b, low_a + 1),
+                high_b,
+            )
+            false_bounds = (max(low_a, low_b), high_a, low_b, min(high_b, high_a))
+
+        case "le":
+            true_bounds = (low_a, min(high_a, high_b), max(low_b, low_a), high_b)
+            false_bounds = (
+                max(low_a, low_b + 1),
+                high_a,
+                low_b,
+                min(high_b, high_a - 1),
+            )
+
+        case "gt" | "ge":
+            # `a > b` is `b < a`
+            reverse_condition = "lt" if condition == "gt" else "le"
+            true_bounds, false_bounds = refine_interval(
+                low_b, high_b, reverse_condition, low_a, high_a
+            )
+            true_bounds = (
+                true_bounds[2],
+                true_bounds[3],
+                true_bounds[0],
+                true_bounds[1],
+            )
+            false_bounds = (
+                false_bounds[2],
+                false_bounds[3],
+                false_bounds[0],
+                false_bounds[1],
+            )
+
+        case "eq" | "ne":
+            low, high = max(low_a, low_b), min(high_a, high_b)
+            equal_bounds = (low, high, low, high)
+            # only a bound equal to a single value can be excluded
+            not_equal_bounds = (low_a, high_a, low_b, high_b)
+            if low_b == high_b:
+                not_equal_bounds = (
+                    low_a + (low_a == low_b),
+                    high_a - (high_a == low_b),
+                    low_b,
+                    high_b,
+                )
+            elif low_a == high_a:
+                not_equal_bounds = (
+                    low_a,
+                    high_a,
+                    low_b + (low_b == low_a),
+                    high_b - (high_b == low_a),
+                )
+            if condition == "eq":
+                true_bounds, false_bounds = equal_bounds, not_equal_bounds
+            else:
+                true_bounds, false_bounds = not_equal_bounds, equal_bounds
+
+        case _:
+            raise Exception(condition)
+
+    return true_bounds, false_bounds
+
+
+def widen_bound(
+    old_bound: int, new_bound: int, thresholds: List[int], is_low: bool
+) -> int:
+    """
+    move an unstable bound to the next threshold, or to the end of the int range
+    """
+    if is_low:
+        if new_bound >= old_bound:
+            return old_bound
+        for threshold in reversed(thresholds):
+            if threshold <= new_bound:
+                return threshold
+        return INT_MIN
+    else:
+        if new_bound <= old_bound:
+            return old_bound
+        for threshold in thresholds:
+            if threshold >= new_bound:
+                return threshold
+        return INT_MAX
 
 
 class ExceptionType(Enum):
     ARITHMETIC_EXCEPTION = "Arithmetic Exception"
 
 
+# the interned variables, keyed by the variable, the memory id and the bounds
+INTERN_DICT: Dict[
+    Tuple[AbstractType | int, None | int, None | Tuple[int, int]], AbstractVariable
+] = {}
+INTERN_LIMIT = 1 << 16
+
+
 class AbstractVariable:
-    def __init__(
-        self, variable: AbstractType | int, memory_id: None | int = None
-    ) -> None:
-        self.memory_id = memory_id  # the index in the memory
-        if isinstance(variable, AbstractType):
-            self.type = variable
-            self.value = None
+    """
+    immutable, equal variables are shared
+    """
+
+    __slots__ = ("type", "value", "memory_id", "mask", "low", "high")
+
+    def __new__(
+        cls,
+        variable: AbstractType | int,
+        memory_id: None | int = None,
+        bounds: None | Tuple[int, int, int] = None,
+    ) -> AbstractVariable:
+        """
+        bounds: the (low, high, mask) of an INTERVAL variable,
+        use from_interval to build it
+        """
+        key = (variable, memory_id, bounds)
+        instance = INTERN_DICT.get(key)
+        if instance is not None:
+            return instance
+
+        instance = object.__new__(cls)
+        if variable == AbstractType.INTERVAL:
+            low, high, mask = bounds
+            object.__setattr__(instance, "type", variable)
+            object.__setattr__(instance, "value", None)
+            object.__setattr__(instance, "mask", mask)
+            object.__setattr__(instance, "low", low)
+            object.__setattr__(instance, "high", high)
+        elif isinstance(variable, AbstractType):
+            low, high = TYPE_BOUNDS_DICT.get(variable, (1, 0))
+            object.__setattr__(instance, "type", variable)
+            object.__setattr__(instance, "value", None)
+            object.__setattr__(instance, "mask", TYPE_MASK_DICT.get(variable, 0))
+            object.__setattr__(instance, "low", low)
+            object.__setattr__(instance, "high", high)
         elif isinstance(variable, int):
-            self.value = variable
-            self.type = AbstractType.INT
+            variable = int(variable)
+            object.__setattr__(instance, "type", AbstractType.INT)
+            object.__setattr__(instance, "value", variable)
+            if variable > 0:
+                object.__setattr__(instance, "mask", POSITIVE_BIT)
+            elif variable < 0:
+                object.__setattr__(instance, "mask", NEGATIVE_BIT)
+            else:
+                object.__setattr__(instance, "mask", ZERO_BIT)
+            object.__setattr__(instance, "low", variable)
+            object.__setattr__(instance, "high", variable)
         else:
-            raise Exception
-
-    def __str__(self) -> str:
-        return f"{str(self.type)}: {str(self.value)}"
-
-    def __add__(self, b: AbstractVariable) -> AbstractVariable:
-        if not isinstance(b, AbstractVariable):
-            raise Exception
-        match self.type:
-            case AbstractType.ANY_INT:
-                match b.type:
-                    case AbstractType.ANY_INT | AbstractType.INT | AbstractType.POSITIVE_INT:
-                        return AbstractVariable(AbstractType.ANY_INT)
+            raise Exception(variable)
+        object.__setattr__(instance, "memory_id", memory_id)  # the index in the memory
 
-                    case _:
-                        raise Exception(b.type)
+        if len(INTERN_DICT) < INTERN_LIMIT:
+            INTERN_DICT[key] = instance
+        return instance
 
-            case AbstractType.INT:
-                match b.type:
-                    case AbstractType.INT:
-                        return AbstractVariable(self.value + b.value)
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(name)
 
-                    case AbstractType.ANY_INT:
-                        return AbstractVariable(AbstractType.ANY_INT)
+    def __copy__(self) -> AbstractVariable:
+        return self
 
-                    case _:
-                        raise Exception(b.type)
+    def __deepcopy__(self, memo: Dict) -> AbstractVariable:
+        return self
 
-            case _:
-                raise Exception(self.type)
+    def __reduce__(self) -> Tuple:
+        return (AbstractVariable, self.get_key())
 
-    def __sub__(self, b: AbstractVariable) -> AbstractVariable:
-        if not isinstance(b, AbstractVariable):
-            raise Exception
-        match self.type:
-            case AbstractType.INT:
-                match b.type:
-                    case AbstractType.INT:
-                        return AbstractVariable(self.value - b.value)
-
-                    case AbstractType.ANY_INT:
-                        return AbstractVariable(AbstractType.ANY_INT)
-
-                    case AbstractType.NOT_POSITIVE_INT:
-                        if self.value == 0:
-                            return AbstractVariable(AbstractType.NOT_NEGATIVE_INT)
-                        elif self.value > 0:
-                            return AbstractVariable(AbstractType.POSITIVE_INT)
-                        else:
-                            return AbstractVariable(AbstractType.ANY_INT)
-
-                    case _:
-                        raise Exception(b.type)
-
-            case AbstractType.ANY_INT:
-                match b.type:
-                    case AbstractType.INT | AbstractType.ANY_INT | AbstractType.POSITIVE_INT:
-                        return AbstractVariable(AbstractType.ANY_INT)
-
-                    case _:
-                        raise Exception(b.type)
-
-            case AbstractType.POSITIVE_INT:
-                match b.type:
-                    case AbstractType.POSITIVE_INT:
-                        return AbstractVariable(AbstractType.ANY_INT)
-
-                    case _:
-                        raise Exception(b.type)
+    def __hash__(self) -> int:
+        return hash(self.get_key())
 
-            case _:
-                raise Exception(self.type)
+    def __str__(self) -> str:
+        if self.type == AbstractType.INTERVAL:
+            if self.mask & ZERO_BIT == 0:
+                return f"{str(self.type)}: [{self.low}, {self.high}] without 0"
+            return f"{str(self.type)}: [{self.low}, {self.high}]"
+        return f"{str(self.type)}: {str(self.value)}"
 
-    def __truediv__(self, b: AbstractVariable) -> AbstractVariable:
+    def get_key(
+        self,
+    ) -> Tuple[AbstractType | int, None | int, None | Tuple[int, int, int]]:
+        """
+        the arguments which build the variable
+        """
+        if self.type == AbstractType.INTERVAL:
+            return (self.type, self.memory_id, (self.low, self.high, self.mask))
+        variable = self.type if self.value is None else self.value
+        return (variable, self.memory_id, None)
+
+    @staticmethod
+    def from_interval(
+        low: int, high: int, memory_id: None | int = None, mask: int = ALL_BITS
+    ) -> AbstractVariable:
+        """
+        the ints between low and high with a sign in the mask,
+        the bounds and the mask are reduced with each other,
+        so only a zero inside the interval needs the mask
+        """
+        if not mask & NEGATIVE_BIT:
+            low = max(low, 0)
+        if not mask & POSITIVE_BIT:
+            high = min(high, 0)
+        if not mask & ZERO_BIT:
+            if low == 0:
+                low = 1
+            if high == 0:
+                high = -1
+        if low > high:
+            return AbstractVariable(AbstractType.BOTTOM, memory_id)
+        if low == high:
+            return AbstractVariable(low, memory_id)
+        interval_mask = get_interval_mask(low, high)
+        mask &= interval_mask
+        if mask == interval_mask:
+            abstract_type = BOUNDS_TYPE_DICT.get((low, high))
+            if abstract_type is not None:
+                return AbstractVariable(abstract_type, memory_id)
+        elif low == INT_MIN and high == INT_MAX:
+            return AbstractVariable(AbstractType.NOT_ZERO, memory_id)
+        return AbstractVariable(AbstractType.INTERVAL, memory_id, (low, high, mask))
+
+    @staticmethod
+    def from_mask(mask: int, memory_id: None | int = None) -> AbstractVariable:
+        if ABSTRACT_MODE == AbstractMode.ANY_INT and mask != 0 and mask != ZERO_BIT:
+            return AbstractVariable(AbstractType.ANY_INT, memory_id)
+        return AbstractVariable(MASK_TYPE_LIST[mask], memory_id)
+
+    def with_memory_id(self, memory_id: None | int) -> AbstractVariable:
+        if memory_id == self.memory_id:
+            return self
+        variable, _, bounds = self.get_key()
+        return AbstractVariable(variable, memory_id, bounds)
+
+    def join(self, b: AbstractVariable) -> AbstractVariable:
+        """
+        return the least upper bound of the two variables
+        """
         if not isinstance(b, AbstractVariable):
             raise Exception
-        match self.type:
-            case AbstractType.INT:
-                match b.type:
-                    case AbstractType.INT:
-                        return AbstractVariable(int(self.value / b.value))
-
-                    case AbstractType.ANY_INT:
-                        return AbstractVariable(AbstractType.ANY_INT)
-
-                    case AbstractType.POSITIVE_INT:
-                        if self.value > 0:
-                            return AbstractVariable(AbstractType.POSITIVE_INT)
-                        elif self.value < 0:
-                            return AbstractVariable(AbstractType.NEGATIVE_INT)
-                        else:
-                            return AbstractVariable(0)
-
-                    case _:
-                        raise Exception(b.type)
-
-            case AbstractType.ANY_INT:
-                match b.type:
-                    case AbstractType.INT | AbstractType.ANY_INT | AbstractType.NOT_NEGATIVE_INT | AbstractType.NOT_POSITIVE_INT:
-                        return AbstractVariable(AbstractType.ANY_INT)
-
-                    case _:
-                        raise Exception(b.type)
-
-            case AbstractType.POSITIVE_INT:
-                match b.type:
-                    case AbstractType.ANY_INT:
-                        return AbstractVariable(AbstractType.ANY_INT)
-
-                    case _:
-                        raise Exception(b.type)
-
-            case _:
-                raise Exception(self.type)
-
-    def __ge__(self, b: AbstractVariable) -> bool | None:
+        memory_id = self.memory_id if self.memory_id == b.memory_id else None
+        if self.get_key()[0::2] == b.get_key()[0::2]:
+            return self.with_memory_id(memory_id)
+        if self.type == AbstractType.BOTTOM:
+            return b.with_memory_id(memory_id)
+        if b.type == AbstractType.BOTTOM:
+            return self.with_memory_id(memory_id)
+        if self.type == AbstractType.VOID or b.type == AbstractType.VOID:
+            raise Exception(self.type, b.type)
+        if ABSTRACT_MODE in INTERVAL_MODE_SET:
+            return AbstractVariable.from_interval(
+                min(self.low, b.low),
+                max(self.high, b.high),
+                memory_id,
+                self.mask | b.mask,
+            )
+        return AbstractVariable.from_mask(self.mask | b.mask, memory_id)
+
+    def includes(self, b: AbstractVariable) -> bool:
+        """
+        return True if every value of b is also a value of self
+        """
         if not isinstance(b, AbstractVariable):
             raise Exception
-        match self.type:
-            case AbstractType.INT:
-                match b.type:
-                    case AbstractType.INT:
-                        return self.value >= b.value
-
-                    case AbstractType.ANY_INT:
-                        return None
-
-                    case _:
-                        raise Exception(b.type)
-
-            case AbstractType.ANY_INT:
-                match b.type:
-                    case AbstractType.INT | AbstractType.ANY_INT:
-                        return None
-
-                    case _:
-                        raise Exception
-
-            case _:
-                raise Exception
-
-    def __gt__(
-        self, b: AbstractVariable
-    ) -> (
-        bool
-        | None
-        | Tuple[
-            Tuple[AbstractVariable, AbstractVariable],
-            Tuple[AbstractVariable, AbstractVariable],
-        ]
-    ):
+        if b.type == AbstractType.BOTTOM:
+            return self.type != AbstractType.VOID
+        if self.type == AbstractType.INT:
+            return b.type == AbstractType.INT and self.value == b.value
+        if self.type == AbstractType.VOID or b.type == AbstractType.VOID:
+            return self.type == b.type
+        if ABSTRACT_MODE in INTERVAL_MODE_SET and not (
+            self.low <= b.low and b.high <= self.high
+        ):
+            return False
+        return b.mask & ~self.mask == 0
+
+    def widen(self, b: AbstractVariable, thresholds: List[int]) -> AbstractVariable:
         """
-        return bool if result is specific
-        return None if result is unkown
-        return Tuple with update variabls tuples,
-            the first tuple is the variables when result is true
-            the second tuple is the variables when result is false
+        return an upper bound of the two variables that makes loops converge,
+        the thresholds are the int constants of the method, sorted
+        """
+        if self.includes(b):
+            return self
+        if (
+            ABSTRACT_MODE in INTERVAL_MODE_SET
+            and self.type != AbstractType.BOTTOM
+            and b.type != AbstractType.BOTTOM
+        ):
+            memory_id = self.memory_id if self.memory_id == b.memory_id else None
+            return AbstractVariable.from_interval(
+                widen_bound(self.low, b.low, thresholds, True),
+                widen_bound(self.high, b.high, thresholds, False),
+                memory_id,
+                self.mask | b.mask,
+            )
+        # the sign lattice has a finite height above the constants,
+        # so the join is already a widening
+        return self.join(b)
+
+    def narrow(self, b: AbstractVariable) -> AbstractVariable:
+        """
+        refine the widened variable self with b, which is computed from self
+        """
+        if not self.includes(b):
+            return self
+        if ABSTRACT_MODE in INTERVAL_MODE_SET and b.type != AbstractType.BOTTOM:
+            # only refine the bounds which were widened to the end of the int range
+            return AbstractVariable.from_interval(
+                b.low if self.low == INT_MIN else self.low,
+                b.high if self.high == INT_MAX else self.high,
+                self.memory_id,
+                self.mask,
+            )
+        return b
+
+    def refine(self, mask: int) -> AbstractVariable:
+        """
+        restrict the variable to the signs of the mask
+        """
+        if mask == self.mask:
+            return self
+        if mask == 0:
+            return AbstractVariable(AbstractType.BOTTOM, self.memory_id)
+        if self.type == AbstractType.INT:
+            return self
+        return AbstractVariable.from_mask(mask, self.memory_id)
+
+    def operate(self, b: AbstractVariable, operation: str) -> AbstractVariable:
+        """
+        return the variable of `self opr b`
         """
         if not isinstance(b, AbstractVariable):
             raise Exception
-        match self.type:
-            case AbstractType.INT:
-                match b.type:
-                    case AbstractType.INT:
-                        return self.value > b.value
-
-                    case AbstractType.ANY_INT:
-                        return None
-
-                    case _:
-                        raise Exception(b.type)
-
-            case AbstractType.ANY_INT:
-                match b.type:
-                    case AbstractType.ANY_INT:
-                        return None
-
-                    case AbstractType.INT:
-                        match ABSTRACT_MODE:
-                            case AbstractMode.ANY_INT:
-                                return None
-
-                            case AbstractMode.SIGN:
-                                true_variables = (
-                                    AbstractVariable(AbstractType.POSITIVE_INT),
-                                    AbstractVariable(0),
-                                )
-                                true_variables[0].memory_id = self.memory_id
-                                true_variables[1].memory_id = b.memory_id
-                                false_variables = (
-                                    AbstractVariable(AbstractType.NOT_POSITIVE_INT),
-                                    AbstractVariable(0),
-                                )
-                                false_variables[0].memory_id = self.memory_id
-                                false_variables[1].memory_id = b.memory_id
-                                return true_variables, false_variables
-
-                            case _:
-                                raise Exception(ABSTRACT_MODE)
-
-                    case _:
-                        raise Exception
-
-            case _:
-                raise Exception
+        if self.type == AbstractType.INT and b.type == AbstractType.INT:
+            if b.value == 0 and (operation == "div" or operation == "rem"):
+                return AbstractVariable(AbstractType.BOTTOM)
+            return AbstractVariable(compute_int(self.value, operation, b.value))
+        if ABSTRACT_MODE in INTERVAL_MODE_SET:
+            low, high = operate_exact_interval(
+                self.low, self.high, operation, b.low, b.high
+            )
+            mask = get_wrapped_mask(low, high)
+            if low >= INT_MIN and high <= INT_MAX:
+                # without an overflow the signs follow the sign domain too
+                mask &= TRANSFER_TABLE_DICT[operation][self.mask << 3 | b.mask]
+            return AbstractVariable.from_interval(*wrap_interval(low, high), mask=mask)
+        return AbstractVariable.from_mask(
+            TRANSFER_TABLE_DICT[operation][self.mask << 3 | b.mask]
+        )
 
-    def __lt__(
-        self, b: AbstractVariable
+    def compare(
+        self, b: AbstractVariable, condition: str
     ) -> (
         bool
         | None
@@ -291,62 +902,34 @@ class AbstractVariable:
         """
         if not isinstance(b, AbstractVariable):
             raise Exception
-        match self.type:
-            case AbstractType.INT:
-                match b.type:
-                    case AbstractType.INT:
-                        return self.value < b.value
-
-                    case _:
-                        raise Exception(b.type)
-
-            case AbstractType.ANY_INT:
-                match b.type:
-                    case AbstractType.ANY_INT:
-                        return None
-
-                    case AbstractType.INT:
-                        match ABSTRACT_MODE:
-                            case AbstractMode.ANY_INT:
-                                return None
-
-                            case AbstractMode.SIGN:
-                                true_variables = (
-                                    AbstractVariable(AbstractType.NEGATIVE_INT),
-                                    AbstractVariable(0),
-                                )
-                                true_variables[0].memory_id = self.memory_id
-                                true_variables[1].memory_id = b.memory_id
-                                false_variables = (
-                                    AbstractVariable(AbstractType.NOT_NEGATIVE_INT),
-                                    AbstractVariable(0),
-                                )
-                                false_variables[0].memory_id = self.memory_id
-                                false_variables[1].memory_id = b.memory_id
-                                return true_variables, false_variables
-
-                            case _:
-                                raise Exception(ABSTRACT_MODE)
-
-                    case _:
-                        raise Exception(b.type)
-
-            case AbstractType.POSITIVE_INT:
-                match b.type:
-                    case AbstractType.INT:
-                        if b.value <= 0:
-                            return False
-                        else:
-                            return None
-
-                    case _:
-                        raise Exception(b.type)
-
-            case _:
-                raise Exception(self.type)
+        if self.type == AbstractType.INT and b.type == AbstractType.INT:
+            return compare_int(self.value, condition, b.value)
+        if ABSTRACT_MODE in INTERVAL_MODE_SET:
+            return self.compare_interval(b, condition)
 
-    def __le__(
-        self, b: AbstractVariable
+        true_a, true_b, false_a, false_b = REFINE_TABLE_DICT[condition][
+            self.mask << 3 | b.mask
+        ]
+        if true_a == 0:
+            return False
+        if false_a == 0:
+            return True
+        if ABSTRACT_MODE == AbstractMode.ANY_INT:
+            return None
+
+        true_variables = (self.refine(true_a), b.refine(true_b))
+        false_variables = (self.refine(false_a), b.refine(false_b))
+        if (
+            true_variables[0] is self
+            and true_variables[1] is b
+            and false_variables[0] is self
+            and false_variables[1] is b
+        ):
+            return None
+        return true_variables, false_variables
+
+    def compare_interval(
+        self, b: AbstractVariable, condition: str
     ) -> (
         bool
         | None
@@ -355,144 +938,482 @@ class AbstractVariable:
             Tuple[AbstractVariable, AbstractVariable],
         ]
     ):
+        true_bounds, false_bounds = refine_interval(
+            self.low, self.high, condition, b.low, b.high
+        )
+        # the signs refine the bounds, e.g. `ne 0` takes zero out of the interval
+        true_a, true_b, false_a, false_b = REFINE_TABLE_DICT[condition][
+            self.mask << 3 | b.mask
+        ]
+        true_variables = (
+            AbstractVariable.from_interval(
+                true_bounds[0], true_bounds[1], self.memory_id, true_a
+            ),
+            AbstractVariable.from_interval(
+                true_bounds[2], true_bounds[3], b.memory_id, true_b
+            ),
+        )
+        false_variables = (
+            AbstractVariable.from_interval(
+                false_bounds[0], false_bounds[1], self.memory_id, false_a
+            ),
+            AbstractVariable.from_interval(
+                false_bounds[2], false_bounds[3], b.memory_id, false_b
+            ),
+        )
+        if any(x.type == AbstractType.BOTTOM for x in true_variables):
+            return False
+        if any(x.type == AbstractType.BOTTOM for x in false_variables):
+            return True
+        if true_variables == false_variables == (self, b):
+            return None
+        return true_variables, false_variables
+
+    def __add__(self, b: AbstractVariable) -> AbstractVariable:
+        return self.operate(b, "add")
+
+    def __sub__(self, b: AbstractVariable) -> AbstractVariable:
+        return self.operate(b, "sub")
+
+    def __mul__(self, b: AbstractVariable) -> AbstractVariable:
+        return self.operate(b, "mul")
+
+    def __truediv__(self, b: AbstractVariable) -> AbstractVariable:
+        return self.operate(b, "div")
+
+    def __mod__(self, b: AbstractVariable) -> AbstractVariable:
+        return self.operate(b, "rem")
+
+    def __ge__(self, b: AbstractVariable):
+        return self.compare(b, "ge")
+
+    def __gt__(self, b: AbstractVariable):
+        return self.compare(b, "gt")
+
+    def __lt__(self, b: AbstractVariable):
+        return self.compare(b, "lt")
+
+    def __le__(self, b: AbstractVariable):
+        return self.compare(b, "le")
+
+    def __ne__(self, b: object) -> bool:
+        return not self == b
+
+    def __eq__(self, b: object) -> bool:
         """
-        return bool if result is specific
-        return None if result is unkown
-        return Tuple with update variabls tuples,
-            the first tuple is the variables when result is true
-            the second tuple is the variables when result is false
+        the same variable, as __hash__ needs for the dicts and the sets,
+        compare(b, "eq") is the abstract comparison
         """
         if not isinstance(b, AbstractVariable):
-            raise Exception
-        match self.type:
-            case AbstractType.INT:
-                match b.type:
-                    case AbstractType.INT:
-                        return self.value <= b.value
-
-                    case _:
-                        raise Exception
-
-            case AbstractType.ANY_INT:
-                match b.type:
-                    case AbstractType.ANY_INT:
-                        return None
-
-                    case AbstractType.INT:
-                        match ABSTRACT_MODE:
-                            case AbstractMode.ANY_INT:
-                                return None
-
-                            case AbstractMode.SIGN:
-                                true_variables = (
-                                    AbstractVariable(AbstractType.NOT_POSITIVE_INT),
-                                    AbstractVariable(0),
-                                )
-                                true_variables[0].memory_id = self.memory_id
-                                true_variables[1].memory_id = b.memory_id
-                                false_variables = (
-                                    AbstractVariable(AbstractType.POSITIVE_INT),
-                                    AbstractVariable(0),
-                                )
-                                false_variables[0].memory_id = self.memory_id
-                                false_variables[1].memory_id = b.memory_id
-                                return true_variables, false_variables
-
-                            case _:
-                                raise Exception(ABSTRACT_MODE)
-
-                    case _:
-                        raise Exception
+            return NotImplemented
+        return self is b or self.get_key() == b.get_key()
+
+
+class Opcode(IntEnum):
+    RETURN = 0
+    PUSH = 1
+    LOAD = 2
+    STORE = 3
+    GET = 4
+    PUT = 5
+    BINARY = 6
+    NEGATE = 7
+    INCR = 8
+    GOTO = 9
+    IF = 10
+    IFZ = 11
+    NEW = 12
+    INVOKE = 13
+    THROW = 14
+    DUP = 15
+    POP = 16
+    CAST = 17
+    CHECKCAST = 18
+    BITOPR = 19
+    COMPAREFLOATING = 20
+    NEWARRAY = 21
+    ARRAYLENGTH = 22
+    ARRAY_LOAD = 23
+    ARRAY_STORE = 24
+    UNKNOWN = 25
+
+
+OPCODE_DICT: Dict[str, Opcode] = {
+    opcode.name.lower(): opcode for opcode in Opcode if opcode != Opcode.UNKNOWN
+}
+
+
+class Instruction:
+    """
+    a bytecode operation decoded once when the method is loaded
+    """
+
+    __slots__ = (
+        "opcode",
+        "opr",
+        "offset",
+        "type",
+        "operant",
+        "condition",
+        "index",
+        "target",
+        "value",
+        "name",
+        "method",
+        "relation",
+        "operation_json",
+    )
 
-            case _:
-                raise Exception
+    def __init__(self, operation_json: JSON_CONTENT) -> None:
+        self.operation_json = operation_json
+        self.opr: str = operation_json["opr"]
+        self.opcode = OPCODE_DICT.get(self.opr, Opcode.UNKNOWN)
+        self.offset: int = operation_json["offset"]
+        self.type: None | str = None
+        self.operant: None | str = None
+        self.condition: None | str = None
+        self.index: None | int = None
+        self.target: None | int = None
+        # the pushed constant or the incr amount
+        self.value: None | AbstractVariable = None
+        # the field name of get and put, the class name of new
+        self.name: None | str = None
+        # the class name, the argument types and the return type of invoke
+        self.method: None | Tuple[None | str, Tuple[None | str, ...], None | str] = None
+        # the local variables the operands are, set by find_relations
+        self.relation: None | Tuple[int, int] = None
+
+        match self.opcode:
+            case Opcode.RETURN | Opcode.LOAD | Opcode.STORE | Opcode.NEGATE:
+                self.type = operation_json["type"]
+                self.index = operation_json.get("index")
+
+            case Opcode.BINARY:
+                self.type = operation_json["type"]
+                self.operant = operation_json["operant"]
+
+            case Opcode.PUSH:
+                value_json = operation_json["value"]
+                if value_json is not None:
+                    self.type = value_json["type"]
+                    if self.type == "integer":
+                        self.value = AbstractVariable(value_json["value"])
+
+            case Opcode.INCR:
+                self.index = operation_json["index"]
+                self.value = AbstractVariable(operation_json["amount"])
+
+            case Opcode.GOTO:
+                self.target = operation_json["target"]
+
+            case Opcode.IF | Opcode.IFZ:
+                self.condition = operation_json["condition"]
+                self.target = operation_json["target"]
+
+            case Opcode.GET | Opcode.PUT:
+                self.name = operation_json["field"]["name"]
+
+            case Opcode.NEW:
+                self.name = operation_json["class"]
+
+            case Opcode.INVOKE:
+                # the access: static, special, virtual, interface or dynamic
+                self.type = operation_json["access"]
+                method_json = operation_json["method"]
+                self.name = method_json["name"]
+                self.method = (
+                    method_json.get("ref", {}).get("name"),
+                    tuple(get_type_descriptor(x) for x in method_json["args"]),
+                    get_type_descriptor(method_json["returns"]),
+                )
 
-    def __ne__(
-        self, b: AbstractVariable
-    ) -> (
-        bool
-        | None
-        | Tuple[
-            Tuple[AbstractVariable, AbstractVariable],
-            Tuple[AbstractVariable, AbstractVariable],
-        ]
-    ):
+    def get_successors(self, index: int) -> List[int]:
         """
-        return bool if result is specific
-        return None if result is unkown
-        return Tuple with update variabls tuples,
-            the first tuple is the variables when result is true
-            the second tuple is the variables when result is false
+        the indexes of the operations which may run after this one at the index
         """
-        if not isinstance(b, AbstractVariable):
-            raise Exception
+        match self.opcode:
+            case Opcode.RETURN | Opcode.THROW:
+                return []
 
-        match self.type:
-            case AbstractType.INT:
-                match b.type:
-                    case AbstractType.INT:
-                        return self.value != b.value
-
-                    case _:
-                        raise Exception
-
-            case AbstractType.ANY_INT:
-                match b.type:
-                    case AbstractType.ANY_INT:
-                        return None
-
-                    case AbstractType.INT:
-                        match ABSTRACT_MODE:
-                            case AbstractMode.ANY_INT:
-                                return None
-
-                            case AbstractMode.SIGN:
-                                true_variables = (
-                                    AbstractVariable(AbstractType.NOT_ZERO),
-                                    AbstractVariable(0),
-                                )
-                                true_variables[0].memory_id = self.memory_id
-                                true_variables[1].memory_id = b.memory_id
-                                false_variables = (
-                                    AbstractVariable(0),
-                                    AbstractVariable(0),
-                                )
-                                false_variables[0].memory_id = self.memory_id
-                                false_variables[1].memory_id = b.memory_id
-                                return true_variables, false_variables
-
-                            case _:
-                                raise Exception(ABSTRACT_MODE)
-
-                    case _:
-                        raise Exception
+            case Opcode.GOTO:
+                return [self.target]
 
-            case _:
-                raise Exception
-
-    def __eq__(self, b: AbstractVariable) -> bool | None:
-        if not isinstance(b, AbstractVariable):
-            raise Exception
+            case Opcode.IF | Opcode.IFZ:
+                return [index + 1, self.target]
 
-        match self.type:
-            case AbstractType.INT:
-                match b.type:
-                    case AbstractType.INT:
-                        return self.value == b.value
+            case _:
+                return [index + 1]
+
+
+# the condition of the other branch
+NEGATED_CONDITION_DICT = {
+    "eq": "ne",
+    "ne": "eq",
+    "lt": "ge",
+    "ge": "lt",
+    "gt": "le",
+    "le": "gt",
+}
+
+
+def get_condition_constraints(
+    condition: str, a: int, b: int
+) -> List[Tuple[int, int, int]]:
+    """
+    the constraints x_i - x_j <= c of `x_a condition x_b`,
+    none for "ne", which is not convex
+    """
+    match condition:
+        case "lt":
+            return [(a, b, -1)]
+        case "le":
+            return [(a, b, 0)]
+        case "gt":
+            return [(b, a, -1)]
+        case "ge":
+            return [(b, a, 0)]
+        case "eq":
+            return [(a, b, 0), (b, a, 0)]
+        case _:
+            return []
+
+
+def is_int_load(instruction: Instruction) -> bool:
+    return instruction.opcode == Opcode.LOAD and instruction.type == "int"
+
+
+def is_int_push(instruction: Instruction) -> bool:
+    return (
+        instruction.opcode == Opcode.PUSH
+        and instruction.value is not None
+        and instruction.value.type == AbstractType.INT
+    )
 
-                    case _:
-                        raise Exception
 
-            case AbstractType.ANY_INT:
-                match b.type:
-                    case AbstractType.INT | AbstractType.ANY_INT:
-                        return None
+def find_relations(instructions: List[Instruction]) -> None:
+    """
+    find the operations whose operands are loaded local variables right before,
+    in straight line code, so the relational domain can use the variables:
+    a `store` of `x_j + c` gets (j, c),
+    an `if` and a `sub` of x_a and x_b get (a, b)
+    """
+    target_set = {x.target for x in instructions if x.target is not None}
+    for index, instruction in enumerate(instructions):
+        # the operations of the pattern, which only run one after the other
+        pattern: List[Instruction] = []
+        for i in range(index, max(index - 4, -1), -1):
+            pattern.insert(0, instructions[i])
+            if i in target_set:
+                break
+        if len(pattern) < 2:
+            continue
+        match instruction.opcode:
+            case Opcode.STORE if instruction.type == "int":
+                if is_int_load(pattern[-2]):
+                    instruction.relation = (pattern[-2].index, 0)
+                elif (
+                    len(pattern) == 4
+                    and pattern[-2].opcode == Opcode.BINARY
+                    and pattern[-2].type == "int"
+                    and pattern[-2].operant in ("add", "sub")
+                ):
+                    a, b = pattern[-4], pattern[-3]
+                    sign = 1 if pattern[-2].operant == "add" else -1
+                    if is_int_load(a) and is_int_push(b):
+                        instruction.relation = (a.index, sign * b.value.value)
+                    elif sign == 1 and is_int_push(a) and is_int_load(b):
+                        instruction.relation = (b.index, a.value.value)
+
+            case Opcode.IF:
+                if (
+                    len(pattern) >= 3
+                    and is_int_load(pattern[-3])
+                    and is_int_load(pattern[-2])
+                ):
+                    instruction.relation = (pattern[-3].index, pattern[-2].index)
+
+            case Opcode.BINARY if instruction.operant == "sub":
+                if (
+                    instruction.type == "int"
+                    and len(pattern) >= 3
+                    and is_int_load(pattern[-3])
+                    and is_int_load(pattern[-2])
+                ):
+                    instruction.relation = (pattern[-3].index, pattern[-2].index)
+
+
+def fold_constants(instructions: List[Instruction]) -> List[None | Instruction]:
+    """
+    decide the `if` and `ifz` of constants in straight line code, the pushed
+    ints and the `$assertionsDisabled` flag, which is always False, and fold
+    the int operations of constants,
+    return the operations, a decided branch is a `goto` or None and the folded
+    operands are None
+    """
+    target_set = {x.target for x in instructions if x.target is not None}
+    folded: List[None | Instruction] = list(instructions)
+    # the constant of each operand and the operations which only push it,
+    # None if unknown, the operands before the straight line code are unknown
+    operands: List[Tuple[None | int, List[int]]] = []
+
+    def pop_operand() -> Tuple[None | int, List[int]]:
+        if len(operands) == 0:
+            return None, []
+        return operands.pop()
+
+    for index, instruction in enumerate(instructions):
+        if index in target_set:
+            operands.clear()
+        match instruction.opcode:
+            case Opcode.PUSH:
+                if is_int_push(instruction):
+                    operands.append((instruction.value.value, [index]))
+                else:
+                    operands.append((None, []))
+
+            case Opcode.GET if instruction.name == "$assertionsDisabled":
+                operands.append((0, [index]))
+
+            case Opcode.LOAD:
+                operands.append((None, []))
+
+            case Opcode.STORE:
+                pop_operand()
+
+            case Opcode.INCR:
+                pass
+
+            case Opcode.NEGATE if instruction.type == "int":
+                a, a_indexes = pop_operand()
+                if a is None:
+                    operands.append((None, []))
+                    continue
+                value = wrap_int(-a)
+                for i in a_indexes:
+                    folded[i] = None
+                folded[index] = Instruction(
+                    {
+                        "opr": "push",
+                        "offset": instruction.offset,
+                        "value": {"type": "integer", "value": value},
+                    }
+                )
+                operands.append((value, [index]))
+
+            case Opcode.BINARY if instruction.type == "int":
+                b, b_indexes = pop_operand()
+                a, a_indexes = pop_operand()
+                if (
+                    a is None
+                    or b is None
+                    or (instruction.operant in ("div", "rem") and b == 0)
+                ):
+                    # a division by zero is left for the interpreter to find
+                    operands.append((None, []))
+                    continue
+                value = compute_int(a, instruction.operant, b)
+                for i in a_indexes + b_indexes:
+                    folded[i] = None
+                folded[index] = Instruction(
+                    {
+                        "opr": "push",
+                        "offset": instruction.offset,
+                        "value": {"type": "integer", "value": value},
+                    }
+                )
+                operands.append((value, [index]))
 
-                    case _:
-                        raise Exception
+            case Opcode.IF | Opcode.IFZ:
+                b, b_indexes = (
+                    pop_operand() if instruction.opcode == Opcode.IF else (0, [])
+                )
+                a, a_indexes = pop_operand()
+                operands.clear()
+                if a is None or b is None:
+                    continue
+                for i in a_indexes + b_indexes:
+                    folded[i] = None
+                if compare_int(a, instruction.condition, b):
+                    folded[index] = Instruction(
+                        {
+                            "opr": "goto",
+                            "offset": instruction.offset,
+                            "target": instruction.target,
+                        }
+                    )
+                else:
+                    folded[index] = None
 
             case _:
-                raise Exception
+                # the effect on the operands is not tracked
+                operands.clear()
+    return folded
+
+
+def prune_instructions(instructions: List[Instruction]) -> List[Instruction]:
+    """
+    fold the constants, then drop the folded operations, the operations no
+    path reaches and the `goto` to the next operation, the targets are
+    remapped and the offsets are kept,
+    repeated until nothing is dropped
+    """
+    while True:
+        size = len(instructions)
+        folded = fold_constants(instructions)
+
+        # the operations reached from the entry, a dropped one falls through
+        is_reached = [False] * size
+        index_stack = [0] if size > 0 else []
+        while len(index_stack) > 0:
+            index = index_stack.pop()
+            if index >= size or is_reached[index]:
+                continue
+            is_reached[index] = True
+            instruction = folded[index]
+            if instruction is None:
+                index_stack.append(index + 1)
+            else:
+                index_stack.extend(instruction.get_successors(index))
+
+        # the first kept operation from each index on, from the back, so a
+        # `goto` over nothing but dropped operations is dropped too
+        is_kept = [False] * size
+        next_kept_indexes = [size] * (size + 1)
+        for index in range(size - 1, -1, -1):
+            instruction = folded[index]
+            is_kept[index] = (
+                is_reached[index]
+                and instruction is not None
+                and not (
+                    instruction.opcode == Opcode.GOTO
+                    and instruction.target > index
+                    and next_kept_indexes[index + 1] >= instruction.target
+                )
+            )
+            next_kept_indexes[index] = (
+                index if is_kept[index] else next_kept_indexes[index + 1]
+            )
+        if all(is_kept) and all(x is y for x, y in zip(folded, instructions)):
+            return instructions
+
+        # the number of kept operations before each index, which is the new
+        # index of the first kept operation from there on
+        new_indexes = [0] * (size + 1)
+        for index in range(size):
+            new_indexes[index + 1] = new_indexes[index] + is_kept[index]
+        instructions = []
+        for index in range(size):
+            if not is_kept[index]:
+                continue
+            instruction = folded[index]
+            if instruction.target is not None:
+                instruction = Instruction(
+                    {
+                        **instruction.operation_json,
+                        "target": new_indexes[instruction.target],
+                    }
+                )
+            instructions.append(instruction)
 
 
 class ProgramCounter:
@@ -501,7 +1422,10 @@ class ProgramCounter:
         self.java_method = java_method
 
     def get_current_operation(self) -> JSON_CONTENT:
-        return self.java_method.bytecode_json[self.index]
+        return self.java_method.instructions[self.index].operation_json
+
+    def get_current_instruction(self) -> Instruction:
+        return self.java_method.instructions[self.index]
 
 
 class AbstractMethodStack:
@@ -513,23 +1437,515 @@ class AbstractMethodStack:
         self.local_variables = parameters
         self.operate_stack: List[Union[AbstractVariable, bool]] = []
         self.program_counter = ProgramCounter(java_method)
+        # True if the stack may be used by other states, copy it before writing
+        self.shared = False
+        # the differences between the local variables in the RELATIONAL mode
+        self.relations: None | DifferenceBoundMatrix = None
+
+    def copy(self) -> AbstractMethodStack:
+        """
+        copy the slots, but share the variables, which are immutable,
+        and the method
+        """
+        new_stack = AbstractMethodStack(
+            self.local_variables.copy(), self.program_counter.java_method
+        )
+        new_stack.operate_stack = self.operate_stack.copy()
+        new_stack.program_counter.index = self.program_counter.index
+        if self.relations is not None:
+            new_stack.relations = self.relations.copy()
+        return new_stack
+
+    def combine(
+        self,
+        b: AbstractMethodStack,
+        combine_variables: Callable[
+            [AbstractVariable, AbstractVariable], AbstractVariable
+        ],
+        combine_relations: Callable[
+            [DifferenceBoundMatrix, DifferenceBoundMatrix], DifferenceBoundMatrix
+        ],
+    ) -> AbstractMethodStack:
+        """
+        combine two stacks at the same program point variable by variable
+        """
+        if len(self.operate_stack) != len(b.operate_stack):
+            raise Exception(len(self.operate_stack), len(b.operate_stack))
+        local_variables: Dict[int, AbstractVariable] = {}
+        for i in self.local_variables.keys() & b.local_variables.keys():
+            local_variables[i] = combine_variables(
+                self.local_variables[i], b.local_variables[i]
+            )
+        new_stack = AbstractMethodStack(
+            local_variables, self.program_counter.java_method
+        )
+        new_stack.operate_stack = [
+            combine_values(x, y, combine_variables)
+            for x, y in zip(self.operate_stack, b.operate_stack)
+        ]
+        new_stack.program_counter.index = self.program_counter.index
+        if self.relations is not None and b.relations is not None:
+            new_stack.relations = combine_relations(self.relations, b.relations)
+        return new_stack
+
+    def join(self, b: AbstractMethodStack) -> AbstractMethodStack:
+        """
+        join two stacks at the same program point
+        """
+        return self.combine(b, AbstractVariable.join, DifferenceBoundMatrix.join)
+
+    def widen(
+        self, b: AbstractMethodStack, thresholds: List[int]
+    ) -> AbstractMethodStack:
+        return self.combine(
+            b, lambda x, y: x.widen(y, thresholds), DifferenceBoundMatrix.widen
+        )
+
+    def narrow(self, b: AbstractMethodStack) -> AbstractMethodStack:
+        return self.combine(b, AbstractVariable.narrow, DifferenceBoundMatrix.narrow)
+
+    def includes(self, b: AbstractMethodStack) -> bool:
+        """
+        return True if the stack b is covered by self
+        """
+        for i in self.local_variables.keys():
+            if i not in b.local_variables:
+                continue
+            if not self.local_variables[i].includes(b.local_variables[i]):
+                return False
+        for x, y in zip(self.operate_stack, b.operate_stack):
+            if isinstance(x, bool) or isinstance(y, bool):
+                if x is not y:
+                    return False
+            elif not x.includes(y):
+                return False
+        if self.relations is not None and b.relations is not None:
+            return self.relations.includes(b.relations)
+        return True
+
+    def constrain(
+        self,
+        variables: Tuple[AbstractVariable, ...],
+        constraints: List[Tuple[int, int, int]],
+    ) -> bool:
+        """
+        write the refined variables, add the constraints x_a - x_b <= c to the
+        relations and narrow the local variables to the bounds they imply,
+        return False if the constraints have no solution
+        """
+        for variable in variables:
+            if variable.memory_id != None:
+                self.local_variables[variable.memory_id] = variable
+        for i, variable in self.local_variables.items():
+            if variable.type != AbstractType.BOTTOM and not self.relations.meet_bounds(
+                i, variable.low, variable.high
+            ):
+                return False
+        for a, b, c in constraints:
+            if not self.relations.add_difference(a, b, c):
+                return False
+        for i, variable in self.local_variables.items():
+            low, high = self.relations.get_bounds(i)
+            if variable.type != AbstractType.BOTTOM and (
+                low > variable.low or high < variable.high
+            ):
+                self.local_variables[i] = AbstractVariable.from_interval(
+                    int(low) if low > variable.low else variable.low,
+                    int(high) if high < variable.high else variable.high,
+                    i,
+                    variable.mask,
+                )
+        return True
+
+
+def combine_values(
+    a: Union[AbstractVariable, bool],
+    b: Union[AbstractVariable, bool],
+    combine_variables: Callable[[AbstractVariable, AbstractVariable], AbstractVariable],
+) -> Union[AbstractVariable, bool]:
+    """
+    combine two operate stack values, which may be booleans
+    """
+    if isinstance(a, bool) and isinstance(b, bool) and a == b:
+        return a
+    if isinstance(a, bool):
+        a = AbstractVariable(int(a))
+    if isinstance(b, bool):
+        b = AbstractVariable(int(b))
+    return combine_variables(a, b)
+
+
+def join_values(
+    a: Union[AbstractVariable, bool], b: Union[AbstractVariable, bool]
+) -> Union[AbstractVariable, bool]:
+    """
+    join two operate stack values, which may be booleans
+    """
+    return combine_values(a, b, AbstractVariable.join)
+
+
+class ControlFlowGraph:
+    """
+    the control flow of a method, built once when the method is loaded:
+    the successors and the predecessors of every operation, the basic blocks,
+    the reverse post order, the dominator tree and the loops
+    """
+
+    def __init__(self, java_method: JavaMethod) -> None:
+        """
+        the nodes are the indexes of the bytecode operations,
+        the blocks are numbered in the order of the bytecode
+        """
+        self.java_method = java_method
+        size = len(java_method.instructions)
+        self.successors: List[List[int]] = []
+        self.predecessors: List[List[int]] = [[] for _ in range(size)]
+        for index, instruction in enumerate(java_method.instructions):
+            successors = instruction.get_successors(index)
+            successors = [x for x in dict.fromkeys(successors) if x < size]
+            self.successors.append(successors)
+            for successor in successors:
+                self.predecessors[successor].append(index)
+
+        self.find_blocks()
+        self.block_reverse_post_order = self.get_reverse_post_order()
+        # the position of each block in the reverse post order
+        self.block_order_dict: Dict[int, int] = {
+            block: i for i, block in enumerate(self.block_reverse_post_order)
+        }
+        # the operations of the blocks in order, only the reachable ones
+        self.reverse_post_order: List[int] = [
+            index
+            for block in self.block_reverse_post_order
+            for index in range(self.block_starts[block], self.block_ends[block])
+        ]
+        self.order_dict: Dict[int, int] = {
+            index: i for i, index in enumerate(self.reverse_post_order)
+        }
+        self.immediate_dominators = self.get_immediate_dominators()
+        self.find_loops()
+
+    def find_blocks(self) -> None:
+        """
+        a block starts at 0, at a jump target and after a jump or a return
+        """
+        size = len(self.successors)
+        leader_set: Set[int] = {0} if size > 0 else set()
+        for index, successors in enumerate(self.successors):
+            if successors != [index + 1]:
+                leader_set.update(successors)
+                if index + 1 < size:
+                    leader_set.add(index + 1)
+        self.block_starts: List[int] = sorted(leader_set)
+        self.block_ends: List[int] = self.block_starts[1:] + [size]
+        # the block of every operation
+        self.block_indexes: List[int] = []
+        for block, (start, end) in enumerate(zip(self.block_starts, self.block_ends)):
+            self.block_indexes.extend([block] * (end - start))
+
+        self.block_successors: List[List[int]] = [
+            [self.block_indexes[x] for x in self.successors[end - 1]]
+            for end in self.block_ends
+        ]
+        self.block_predecessors: List[List[int]] = [
+            [self.block_indexes[x] for x in self.predecessors[start]]
+            for start in self.block_starts
+        ]
+
+    def get_reverse_post_order(self) -> List[int]:
+        """
+        the reachable blocks, every block before its successors
+        but for the back edges
+        """
+        if len(self.block_starts) == 0:
+            return []
+        post_order: List[int] = []
+        visited: Set[int] = {0}
+        work_stack: List[Tuple[int, int]] = [(0, 0)]
+        while len(work_stack) > 0:
+            block, successor_index = work_stack.pop()
+            if successor_index < len(self.block_successors[block]):
+                work_stack.append((block, successor_index + 1))
+                successor = self.block_successors[block][successor_index]
+                if successor not in visited:
+                    visited.add(successor)
+                    work_stack.append((successor, 0))
+            else:
+                post_order.append(block)
+        post_order.reverse()
+        return post_order
+
+    def get_immediate_dominators(self) -> List[int]:
+        """
+        the immediate dominator of every block, the entry block is its own
+        and an unreachable block has -1, Cooper, Harvey and Kennedy
+        """
+        immediate_dominators = [-1] * len(self.block_starts)
+        if len(immediate_dominators) == 0:
+            return immediate_dominators
+        immediate_dominators[0] = 0
+        order_dict = self.block_order_dict
+
+        def intersect(a: int, b: int) -> int:
+            while a != b:
+                while order_dict[a] > order_dict[b]:
+                    a = immediate_dominators[a]
+                while order_dict[b] > order_dict[a]:
+                    b = immediate_dominators[b]
+            return a
+
+        is_changed = True
+        while is_changed:
+            is_changed = False
+            for block in self.block_reverse_post_order[1:]:
+                new_dominator = -1
+                for predecessor in self.block_predecessors[block]:
+                    if immediate_dominators[predecessor] == -1:
+                        continue
+                    if new_dominator == -1:
+                        new_dominator = predecessor
+                    else:
+                        new_dominator = intersect(predecessor, new_dominator)
+                if immediate_dominators[block] != new_dominator:
+                    immediate_dominators[block] = new_dominator
+                    is_changed = True
+        return immediate_dominators
+
+    def find_loops(self) -> None:
+        """
+        an edge to a dominating block closes a natural loop, an edge backward
+        in the reverse post order to a block which does not dominate it enters
+        an irreducible loop, which gets a head but no body
+        """
+        # the blocks of the natural loop of each head block
+        self.loop_body_dict: Dict[int, Set[int]] = {}
+        loop_head_block_set: Set[int] = set()
+        for block in self.block_reverse_post_order:
+            for successor in self.block_successors[block]:
+                if self.block_order_dict[successor] > self.block_order_dict[block]:
+                    continue
+                loop_head_block_set.add(successor)
+                if not self.dominates_block(successor, block):
+                    continue
+                # the blocks which reach the edge without passing the head
+                body = self.loop_body_dict.setdefault(successor, {successor})
+                block_stack = [block]
+                while len(block_stack) > 0:
+                    body_block = block_stack.pop()
+                    if body_block in body:
+                        continue
+                    body.add(body_block)
+                    block_stack.extend(
+                        x
+                        for x in self.block_predecessors[body_block]
+                        if x in self.block_order_dict
+                    )
+
+        self.loop_head_set: Set[int] = {
+            self.block_starts[block] for block in loop_head_block_set
+        }
+        # the number of natural loops around every block
+        self.block_loop_depths: List[int] = [0] * len(self.block_starts)
+        for body in self.loop_body_dict.values():
+            for block in body:
+                self.block_loop_depths[block] += 1
+
+    def dominates_block(self, a: int, b: int) -> bool:
+        """
+        return True if every path from the entry to the block b passes a
+        """
+        if self.immediate_dominators[b] == -1:
+            return False
+        while b != a and b != 0:
+            b = self.immediate_dominators[b]
+        return b == a
+
+    def dominates(self, a: int, b: int) -> bool:
+        """
+        return True if every path from the entry to the operation at the index b
+        passes the operation at the index a
+        """
+        block_a = self.block_indexes[a]
+        block_b = self.block_indexes[b]
+        if block_a == block_b:
+            return a <= b and self.immediate_dominators[block_a] != -1
+        return self.dominates_block(block_a, block_b)
+
+    def get_immediate_dominator(self, index: int) -> int:
+        """
+        the index of the operation right before in the dominator tree,
+        -1 for the entry and for the unreachable operations
+        """
+        block = self.block_indexes[index]
+        if self.immediate_dominators[block] == -1:
+            return -1
+        if index > self.block_starts[block]:
+            return index - 1
+        if block == 0:
+            return -1
+        return self.block_ends[self.immediate_dominators[block]] - 1
+
+    def is_merge_point(self, index: int) -> bool:
+        return len(self.predecessors[index]) > 1
+
+    def is_loop_head(self, index: int) -> bool:
+        return index in self.loop_head_set
+
+    def get_loop_depth(self, index: int) -> int:
+        """
+        the number of natural loops around the operation at the index
+        """
+        return self.block_loop_depths[self.block_indexes[index]]
+
+    def get_thresholds(self) -> List[int]:
+        """
+        the int constants pushed in the method and their neighbours,
+        which are the bounds loops usually stop at
+        """
+        threshold_set: Set[int] = {-1, 0, 1}
+        for instruction in self.java_method.instructions:
+            if instruction.opcode == Opcode.PUSH and instruction.value is not None:
+                value: int = instruction.value.value
+                threshold_set.update((value - 1, value, value + 1))
+        return sorted(threshold_set)
+
+
+class LazyClassDict(Mapping):
+    """
+    index the classes by name, but only read and build a JavaClass
+    the first time it is looked up
+    """
+
+    def __init__(
+        self,
+        path_dict: Dict[str, str],
+        class_dict: None | Dict[str, JavaClass] = None,
+    ) -> None:
+        """
+        class_dict: the classes loaded before
+        """
+        self.path_dict = path_dict
+        self.class_dict: Dict[str, JavaClass] = {} if class_dict is None else class_dict
+
+    def __getitem__(self, class_name: str) -> JavaClass:
+        java_class = self.class_dict.get(class_name)
+        if java_class is None:
+            java_class = JavaClass(read_json(self.path_dict[class_name]))
+            self.class_dict[class_name] = java_class
+        return java_class
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.path_dict)
+
+    def __len__(self) -> int:
+        return len(self.path_dict)
+
+    def is_loaded(self, class_name: str) -> bool:
+        return class_name in self.class_dict
 
 
 class JavaProgram:
     def __init__(
-        self, project_name: str, init_class_name: str, init_method_name: str
+        self,
+        project_name: str,
+        init_class_name: None | str = None,
+        init_method_name: None | str = None,
+        json_directory: None | str = None,
+        java_class_dict: None | Mapping[str, JavaClass] = None,
     ) -> None:
-        self.java_class_dict: Dict[str, JavaClass] = {}
-        for json_str in load_class_files(project_name):
-            java_class = JavaClass(json_str)
-            self.java_class_dict[java_class.id] = java_class
+        """
+        json_directory: read the json files converted before from the directory,
+        instead of converting the class files of the project
+        java_class_dict: the classes loaded before, the files are not indexed
+        """
+        if java_class_dict is None:
+            if json_directory is None:
+                path_dict = index_class_files(project_name)
+            else:
+                path_dict = index_json_files(json_directory)
+            java_class_dict = LazyClassDict(path_dict)
+        self.java_class_dict: Mapping[str, JavaClass] = java_class_dict
+        self.summary_table = SummaryTable()
 
+        self.init_class_name = init_class_name
+        self.init_method_name = init_method_name
+        self.init_method: None | JavaMethod = None
+        if init_class_name is not None and init_method_name is not None:
+            self.set_init_method(init_class_name, init_method_name)
+
+    def set_init_method(self, init_class_name: str, init_method_name: str) -> None:
         self.init_class_name = init_class_name
         self.init_method_name = init_method_name
         self.init_method = self.java_class_dict[init_class_name].method_dict[
             init_method_name
         ]
 
+    def get_case_names(self) -> List[Tuple[str, str]]:
+        """
+        the class name and the method name of every method with "@Case"
+        """
+        case_names: List[Tuple[str, str]] = []
+        for class_name, java_class in self.java_class_dict.items():
+            for method_name in java_class.method_dict.keys():
+                case_names.append((class_name, method_name))
+        return case_names
+
+
+# the number of summaries kept, the least recently used ones are dropped
+SUMMARY_TABLE_SIZE = 4096
+# the calls analysed inside each other before the arguments are widened to any
+CALL_DEPTH_LIMIT = 8
+
+
+class MethodSummary:
+    """
+    the result of a method for one abstract argument tuple
+    """
+
+    def __init__(
+        self,
+        return_value: None | AbstractVariable,
+        exception_set: Set[ExceptionType],
+    ) -> None:
+        # None if the method never returns normally
+        self.return_value = return_value
+        self.exception_set = exception_set
+
+
+class SummaryTable:
+    """
+    the summaries of the analysed calls, keyed by the method and the abstract
+    arguments, shared by all the interpreters of a program
+    """
+
+    def __init__(
+        self,
+        size_limit: int = SUMMARY_TABLE_SIZE,
+        depth_limit: int = CALL_DEPTH_LIMIT,
+    ) -> None:
+        self.size_limit = size_limit
+        self.depth_limit = depth_limit
+        self.summary_dict: OrderedDict[Tuple, MethodSummary] = OrderedDict()
+        # the keys of the calls being analysed
+        self.call_stack: List[Tuple] = []
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def get(self, key: Tuple) -> None | MethodSummary:
+        summary = self.summary_dict.get(key)
+        if summary is None:
+            self.miss_count += 1
+            return None
+        self.hit_count += 1
+        self.summary_dict.move_to_end(key)
+        return summary
+
+    def put(self, key: Tuple, summary: MethodSummary) -> None:
+        self.summary_dict[key] = summary
+        self.summary_dict.move_to_end(key)
+        while len(self.summary_dict) > self.size_limit:
+            self.summary_dict.popitem(last=False)
+
 
 class IdGenerator:
     def __init__(self) -> None:
@@ -546,23 +1962,621 @@ class AbstractState:
         self.stack = stack
         self.return_value = AbstractVariable(AbstractType.VOID)
 
+    def fork(self, id: int) -> AbstractState:
+        """
+        the new state gets its own copy of the top method stack,
+        the other method stacks are shared and copied on the first write
+        """
+        for method_stack in self.stack[:-1]:
+            method_stack.shared = True
+        new_state = AbstractState(id, self.stack[:-1])
+        new_state.stack.append(self.stack[-1].copy())
+        new_state.return_value = self.return_value
+        return new_state
+
+    def get_method_stack(self, index: int = -1) -> AbstractMethodStack:
+        """
+        return the method stack to write, copy it first if it is shared
+        """
+        method_stack = self.stack[index]
+        if method_stack.shared:
+            method_stack = method_stack.copy()
+            self.stack[index] = method_stack
+        return method_stack
+
+    def join(self, b: AbstractState) -> AbstractState:
+        """
+        join two states at the same location method stack by method stack
+        """
+        new_state = AbstractState(
+            self.id, [x.join(y) for x, y in zip(self.stack, b.stack)]
+        )
+        new_state.return_value = self.return_value
+        return new_state
+
+    def get_location(self) -> Tuple[Tuple[JavaMethod, int], ...]:
+        """
+        the method and the program counter index of every method stack
+        """
+        return tuple(
+            (
+                method_stack.program_counter.java_method,
+                method_stack.program_counter.index,
+            )
+            for method_stack in self.stack
+        )
+
+    def get_key(self) -> Tuple:
+        """
+        equal for states with the same location and the same values
+        """
+        return tuple(
+            (
+                tuple(
+                    (i, x.get_key()) for i, x in method_stack.local_variables.items()
+                ),
+                tuple(
+                    x if isinstance(x, bool) else x.get_key()
+                    for x in method_stack.operate_stack
+                ),
+                (
+                    None
+                    if method_stack.relations is None
+                    else method_stack.relations.get_key()
+                ),
+            )
+            for method_stack in self.stack
+        )
+
+
+class SchedulerType(Enum):
+    BFS = "Breadth First"
+    DFS = "Depth First"
+    PRIORITY = "Priority"
+    BUDGET = "Budget"
+    SPILL = "Spill"
+
+
+class Scheduler:
+    """
+    the frontier of the states waiting to step, the subclasses decide the order
+    """
+
+    def push(self, state: AbstractState) -> None:
+        raise NotImplementedError
+
+    def pop(self) -> AbstractState:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def create_state_index(self) -> StateIndex:
+        """
+        the index of the seen states the interpreter keeps beside the frontier
+        """
+        return StateIndex()
+
+    def close(self) -> None:
+        """
+        free what the frontier holds outside memory when the run ends
+        """
+        pass
+
+
+class BreadthFirstScheduler(Scheduler):
+    def __init__(self) -> None:
+        self.state_queue: deque[AbstractState] = deque()
+
+    def push(self, state: AbstractState) -> None:
+        self.state_queue.append(state)
+
+    def pop(self) -> AbstractState:
+        return self.state_queue.popleft()
+
+    def __len__(self) -> int:
+        return len(self.state_queue)
+
+
+class DepthFirstScheduler(Scheduler):
+    def __init__(self) -> None:
+        self.state_list: List[AbstractState] = []
+
+    def push(self, state: AbstractState) -> None:
+        self.state_list.append(state)
+
+    def pop(self) -> AbstractState:
+        return self.state_list.pop()
+
+    def __len__(self) -> int:
+        return len(self.state_list)
+
+
+def is_exception_target(instruction: Instruction) -> bool:
+    """
+    the operations which may throw, a `div`, a `rem` or a failed assertion
+    """
+    match instruction.opcode:
+        case Opcode.BINARY:
+            return instruction.operant in ("div", "rem")
+
+        case Opcode.NEW:
+            return instruction.name == "java/lang/AssertionError"
+
+    return False
+
+
+class PriorityScheduler(Scheduler):
+    """
+    step the state nearest to a `div`, `rem` or `new java/lang/AssertionError`
+    no state has reached yet, to find the exceptions early
+    """
+
+    def __init__(self) -> None:
+        # the distance, the push order and the state
+        self.state_heap: List[Tuple[int, int, AbstractState]] = []
+        self.push_count = 0
+        self.visited_target_set: Set[Tuple[JavaMethod, int]] = set()
+        # the distance of each index to the nearest unvisited target
+        self.distance_dict: Dict[JavaMethod, List[int]] = {}
+
+    def get_distances(self, java_method: JavaMethod) -> List[int]:
+        distances = self.distance_dict.get(java_method)
+        if distances is not None:
+            return distances
+        control_flow_graph = java_method.control_flow_graph
+        size = len(java_method.instructions)
+        # farther than every reachable target
+        distances = [size + 1] * size
+        index_queue: deque[int] = deque()
+        for index, instruction in enumerate(java_method.instructions):
+            if (java_method, index) in self.visited_target_set:
+                continue
+            if is_exception_target(instruction):
+                distances[index] = 0
+                index_queue.append(index)
+        # search backward from the targets
+        while len(index_queue) > 0:
+            index = index_queue.popleft()
+            for predecessor in control_flow_graph.predecessors[index]:
+                if distances[predecessor] > distances[index] + 1:
+                    distances[predecessor] = distances[index] + 1
+                    index_queue.append(predecessor)
+        self.distance_dict[java_method] = distances
+        return distances
+
+    def get_distance(self, state: AbstractState) -> int:
+        program_counter = state.stack[-1].program_counter
+        return self.get_distances(program_counter.java_method)[program_counter.index]
+
+    def push(self, state: AbstractState) -> None:
+        self.push_count += 1
+        heapq.heappush(
+            self.state_heap, (self.get_distance(state), self.push_count, state)
+        )
+
+    def pop(self) -> AbstractState:
+        _, _, state = heapq.heappop(self.state_heap)
+        program_counter = state.stack[-1].program_counter
+        java_method = program_counter.java_method
+        index = program_counter.index
+        if (
+            is_exception_target(java_method.instructions[index])
+            and (java_method, index) not in self.visited_target_set
+        ):
+            # head for the other targets from now on
+            self.visited_target_set.add((java_method, index))
+            del self.distance_dict[java_method]
+            self.state_heap = [
+                (self.get_distance(x), push_count, x)
+                for _, push_count, x in self.state_heap
+            ]
+            heapq.heapify(self.state_heap)
+        return state
+
+    def __len__(self) -> int:
+        return len(self.state_heap)
+
+
+# the default budget of the frontier
+FRONTIER_STATE_LIMIT = 1024
+FRONTIER_MEMORY_LIMIT = 64 * 1024 * 1024
+
+
+def get_state_size(state: AbstractState) -> int:
+    """
+    an estimate of the bytes only the state holds, the variables are shared
+    """
+    return sys.getsizeof(state) + sum(
+        get_method_stack_size(method_stack) for method_stack in state.stack
+    )
+
+
+def get_method_stack_size(method_stack: AbstractMethodStack) -> int:
+    size = sys.getsizeof(method_stack)
+    size += sys.getsizeof(method_stack.local_variables)
+    size += sys.getsizeof(method_stack.operate_stack)
+    if method_stack.relations is not None:
+        size += sys.getsizeof(method_stack.relations.bounds)
+    return size
+
+
+def get_key_size(key: Tuple) -> int:
+    """
+    an estimate of the bytes of the nested tuples of a key
+    """
+    size = sys.getsizeof(key)
+    if isinstance(key, tuple):
+        for x in key:
+            size += get_key_size(x)
+    return size
+
+
+class BudgetScheduler(Scheduler):
+    """
+    depth first, but when the frontier crosses the state limit or the memory
+    limit, the states at the same location are joined into one, the join
+    cannot go below the number of locations, so the next merge waits until
+    the frontier is back at the limits or twice what the merge left
+    """
+
+    def __init__(
+        self,
+        state_limit: int = FRONTIER_STATE_LIMIT,
+        memory_limit: int = FRONTIER_MEMORY_LIMIT,
+    ) -> None:
+        self.state_limit = state_limit
+        self.memory_limit = memory_limit
+        self.state_list: List[AbstractState] = []
+        self.memory_size = 0
+        self.merge_count = 0
+        # the sizes the next merge waits for
+        self.merge_state_limit = state_limit
+        self.merge_memory_limit = memory_limit
+
+    def push(self, state: AbstractState) -> None:
+        self.state_list.append(state)
+        self.memory_size += get_state_size(state)
+        if (
+            len(self.state_list) > self.merge_state_limit
+            or self.memory_size > self.merge_memory_limit
+        ):
+            self.merge()
+
+    def pop(self) -> AbstractState:
+        state = self.state_list.pop()
+        self.memory_size -= get_state_size(state)
+        return state
+
+    def merge(self) -> None:
+        """
+        join the states at the same location, this loses precision,
+        but the number of locations is bounded by the program
+        """
+        state_dict: Dict[Tuple, AbstractState] = {}
+        for state in self.state_list:
+            location = state.get_location()
+            old_state = state_dict.get(location)
+            if old_state is None:
+                state_dict[location] = state
+            else:
+                state_dict[location] = old_state.join(state)
+                self.merge_count += 1
+        self.state_list = list(state_dict.values())
+        self.memory_size = sum(get_state_size(state) for state in self.state_list)
+        self.merge_state_limit = max(self.state_limit, 2 * len(self.state_list))
+        self.merge_memory_limit = max(self.memory_limit, 2 * self.memory_size)
+
+    def __len__(self) -> int:
+        return len(self.state_list)
+
+
+# the size of each record of the spill file
+RECORD_SIZE = struct.Struct("<I")
+
+
+class SpillScheduler(Scheduler):
+    """
+    depth first, but when the frontier is over the memory limit the bottom
+    half of it is appended to a file as one record, the last record is read
+    back and cut off when the states in memory run out, so the states step in
+    the same order as with the DepthFirstScheduler and nothing is joined
+    """
+
+    def __init__(
+        self,
+        memory_limit: int = FRONTIER_MEMORY_LIMIT,
+        spill_directory: None | str = None,
+    ) -> None:
+        """
+        memory_limit: the bytes of the states in memory and of the state index,
+        each of them gets half
+        spill_directory: where the file is made, the temporary directory by default
+        """
+        self.memory_limit = memory_limit
+        self.index_memory_limit = memory_limit // 2
+        self.frontier_memory_limit = memory_limit - self.index_memory_limit
+        self.spill_directory = spill_directory
+        self.state_list: List[AbstractState] = []
+        self.memory_size = 0
+        # the file only holds the number of each method
+        self.java_method_list: List[JavaMethod] = []
+        self.method_number_dict: Dict[JavaMethod, int] = {}
+        self.spill_file: None | BinaryIO = None
+        # the offset and the number of states of every record in the file
+        self.record_list: List[Tuple[int, int]] = []
+        self.spilled_state_count = 0
+        self.spill_count = 0
+        self.spilled_size = 0
+
+    def push(self, state: AbstractState) -> None:
+        self.state_list.append(state)
+        self.memory_size += get_state_size(state)
+        if self.memory_size > self.frontier_memory_limit and len(self.state_list) > 1:
+            self.spill()
+
+    def pop(self) -> AbstractState:
+        if len(self.state_list) == 0:
+            self.load()
+        state = self.state_list.pop()
+        self.memory_size -= get_state_size(state)
+        return state
+
+    def get_method_number(self, java_method: JavaMethod) -> int:
+        method_number = self.method_number_dict.get(java_method)
+        if method_number is None:
+            method_number = len(self.java_method_list)
+            self.java_method_list.append(java_method)
+            self.method_number_dict[java_method] = method_number
+        return method_number
+
+    def encode_state(self, state: AbstractState) -> Tuple:
+        """
+        the state as tuples of ints and variables, which pickle as the
+        arguments that build them, the shared method stacks are written once
+        for every state
+        """
+        return (
+            state.id,
+            state.return_value,
+            tuple(
+                (
+                    self.get_method_number(method_stack.program_counter.java_method),
+                    method_stack.program_counter.index,
+                    tuple(method_stack.local_variables.items()),
+                    tuple(method_stack.operate_stack),
+                    (
+                        None
+                        if method_stack.relations is None
+                        else (
+                            method_stack.relations.size,
+                            method_stack.relations.bounds.tobytes(),
+                            method_stack.relations.is_closed,
+                        )
+                    ),
+                )
+                for method_stack in state.stack
+            ),
+        )
+
+    def decode_state(self, state_tuple: Tuple) -> AbstractState:
+        id, return_value, stack_tuple = state_tuple
+        stack: List[AbstractMethodStack] = []
+        for method_number, index, local_items, operands, relations in stack_tuple:
+            method_stack = AbstractMethodStack(
+                dict(local_items), self.java_method_list[method_number]
+            )
+            method_stack.program_counter.index = index
+            method_stack.operate_stack = list(operands)
+            if relations is not None:
+                size, bounds_bytes, is_closed = relations
+                bounds = array("d")
+                bounds.frombytes(bounds_bytes)
+                method_stack.relations = DifferenceBoundMatrix(size, bounds)
+                method_stack.relations.is_closed = is_closed
+            stack.append(method_stack)
+        state = AbstractState(id, stack)
+        state.return_value = return_value
+        return state
+
+    def spill(self) -> None:
+        """
+        append the bottom half of the states in memory to the file
+        """
+        spilled_states = self.state_list[: len(self.state_list) // 2]
+        del self.state_list[: len(spilled_states)]
+        record = pickle.dumps(
+            [self.encode_state(x) for x in spilled_states], pickle.HIGHEST_PROTOCOL
+        )
+        if self.spill_file is None:
+            self.spill_file = tempfile.TemporaryFile(dir=self.spill_directory)
+        self.spill_file.seek(0, os.SEEK_END)
+        self.record_list.append((self.spill_file.tell(), len(spilled_states)))
+        self.spill_file.write(RECORD_SIZE.pack(len(record)))
+        self.spill_file.write(record)
+        self.spilled_state_count += len(spilled_states)
+        self.spill_count += 1
+        self.spilled_size += len(record)
+        self.memory_size -= sum(get_state_size(x) for x in spilled_states)
+
+    def load(self) -> None:
+        """
+        read the last record back and cut it off the file
+        """
+        if len(self.record_list) == 0:
+            raise IndexError("pop from an empty scheduler")
+        record_offset, state_count = self.record_list.pop()
+        self.spill_file.seek(record_offset)
+        (record_size,) = RECORD_SIZE.unpack(self.spill_file.read(RECORD_SIZE.size))
+        states = [
+            self.decode_state(x)
+            for x in pickle.loads(self.spill_file.read(record_size))
+        ]
+        self.spill_file.truncate(record_offset)
+        self.spilled_state_count -= state_count
+        self.state_list.extend(states)
+        self.memory_size += sum(get_state_size(x) for x in states)
+
+    def __len__(self) -> int:
+        return len(self.state_list) + self.spilled_state_count
+
+    def create_state_index(self) -> StateIndex:
+        return StateIndex(memory_limit=self.index_memory_limit)
+
+    def close(self) -> None:
+        """
+        close the file, the spilled states are gone with it
+        """
+        if self.spill_file is not None:
+            self.spill_file.close()
+
+
+def create_scheduler(scheduler_type: SchedulerType) -> Scheduler:
+    match scheduler_type:
+        case SchedulerType.BFS:
+            return BreadthFirstScheduler()
+
+        case SchedulerType.DFS:
+            return DepthFirstScheduler()
+
+        case SchedulerType.PRIORITY:
+            return PriorityScheduler()
+
+        case SchedulerType.BUDGET:
+            return BudgetScheduler()
+
+        case SchedulerType.SPILL:
+            return SpillScheduler()
+
+    raise Exception(scheduler_type)
+
+
+# the snapshots kept at each location for the inclusion check
+SNAPSHOT_LIMIT = 4
+
+
+class StateIndex:
+    """
+    the keys of the states seen at each location, an equal state has nothing
+    new to explore, and snapshots of the last few states there, a state one
+    of them includes has nothing new either
+    """
+
+    def __init__(
+        self, snapshot_limit: int = SNAPSHOT_LIMIT, memory_limit: None | int = None
+    ) -> None:
+        """
+        memory_limit: the bytes of the keys and the snapshots, over it the
+        oldest are forgotten, unbounded by default
+        """
+        self.snapshot_limit = snapshot_limit
+        self.memory_limit = memory_limit
+        # the size of every key, the oldest first
+        self.key_dict: Dict[Tuple, int] = {}
+        self.snapshot_dict: Dict[
+            Tuple, deque[Tuple[int, Tuple[AbstractMethodStack, ...]]]
+        ] = {}
+        self.key_size = 0
+        self.snapshot_size = 0
+        self.drop_count = 0
+        self.forget_count = 0
+
+    def add(self, state: AbstractState) -> bool:
+        """
+        return False if the state equals a seen state or a snapshot includes it,
+        otherwise remember a snapshot of it in place of the oldest one
+        and return True
+        """
+        location = state.get_location()
+        key = (location, state.get_key())
+        if key in self.key_dict:
+            self.drop_count += 1
+            return False
+        key_size = 0 if self.memory_limit is None else get_key_size(key)
+        self.key_dict[key] = key_size
+        self.key_size += key_size
+        # the locations in the order they were last seen
+        snapshots = self.snapshot_dict.pop(location, None)
+        if snapshots is None:
+            snapshots = deque()
+        self.snapshot_dict[location] = snapshots
+        for _, snapshot in snapshots:
+            if all(a.includes(b) for a, b in zip(snapshot, state.stack)):
+                self.drop_count += 1
+                return False
+
+        # the states change in place when they step, keep copies
+        snapshot = tuple(method_stack.copy() for method_stack in state.stack)
+        snapshot_size = (
+            0
+            if self.memory_limit is None
+            else sum(get_method_stack_size(x) for x in snapshot)
+        )
+        if len(snapshots) == self.snapshot_limit:
+            self.snapshot_size -= snapshots.popleft()[0]
+        snapshots.append((snapshot_size, snapshot))
+        self.snapshot_size += snapshot_size
+        if self.memory_limit is not None:
+            self.forget()
+        return True
+
+    def forget(self) -> None:
+        """
+        forget the oldest keys, then the snapshots of the location seen
+        longest ago, until the index is within the memory limit, the snapshots
+        go last since they stop the loops, a forgotten state is only explored
+        again
+        """
+        while self.key_size + self.snapshot_size > self.memory_limit:
+            if len(self.key_dict) > 0:
+                key = next(iter(self.key_dict))
+                self.key_size -= self.key_dict.pop(key)
+            else:
+                location = next(iter(self.snapshot_dict))
+                self.snapshot_size -= sum(
+                    size for size, _ in self.snapshot_dict.pop(location)
+                )
+            self.forget_count += 1
+
 
 class AbstractInterpreter:
     def __init__(
-        self, java_program: JavaProgram, init_peremeters: List[AbstractVariable]
+        self,
+        java_program: JavaProgram,
+        init_peremeters: List[AbstractVariable],
+        tracer: None | Tracer = None,
+        init_method: None | JavaMethod = None,
+        scheduler: None | Scheduler = None,
     ) -> None:
+        """
+        init_method: the analysed method, the init method of the program by default
+        scheduler: the order the states step in, breadth first by default
+        """
         self.java_program = java_program
+        self.tracer = Tracer() if tracer is None else tracer
+        self.scheduler = BreadthFirstScheduler() if scheduler is None else scheduler
+        # the number of executed instructions
+        self.step_count = 0
+        self.peak_frontier_size = 0
+        self.init_method = (
+            java_program.init_method if init_method is None else init_method
+        )
         self.state_list: List[AbstractState] = []
         init_stack: List[AbstractMethodStack] = []
         self.id_generator = IdGenerator()
 
         init_local_vars: Dict[AbstractVariable] = {}
         for i in range(len(init_peremeters)):
-            init_peremeters[i].memory_id = i
-            init_local_vars[i] = init_peremeters[i]
-        init_method_stack = AbstractMethodStack(
-            init_local_vars, self.java_program.init_method
-        )
+            init_local_vars[i] = init_peremeters[i].with_memory_id(i)
+        init_method_stack = AbstractMethodStack(init_local_vars, self.init_method)
+        if ABSTRACT_MODE == AbstractMode.RELATIONAL:
+            init_method_stack.relations = DifferenceBoundMatrix(
+                self.init_method.local_count
+            )
+            for i, variable in init_local_vars.items():
+                init_method_stack.relations.assign_bounds(
+                    i, variable.low, variable.high
+                )
         init_stack.append(init_method_stack)
         init_state = AbstractState(self.id_generator.get_new_id(), init_stack)
         self.state_list.append(init_state)
@@ -570,406 +2584,889 @@ class AbstractInterpreter:
         self.yes_exception_set: Set[ExceptionType] = set()
         self.maybe_exception_set: Set[ExceptionType] = set()
 
+        # the states seen at merge points, to drop the covered ones
+        self.state_index = self.scheduler.create_state_index()
+
+        # the step function of each opcode
+        self.dispatch_table: List[
+            Callable[
+                [AbstractState, AbstractMethodStack, Instruction],
+                None | AbstractState,
+            ]
+        ] = [self.step_unsupported for _ in Opcode]
+        for opcode, step_function in (
+            (Opcode.RETURN, self.step_return),
+            (Opcode.PUSH, self.step_push),
+            (Opcode.LOAD, self.step_load),
+            (Opcode.STORE, self.step_store),
+            (Opcode.GET, self.step_get),
+            (Opcode.BINARY, self.step_binary),
+            (Opcode.NEGATE, self.step_negate),
+            (Opcode.INCR, self.step_incr),
+            (Opcode.GOTO, self.step_goto),
+            (Opcode.IF, self.step_if),
+            (Opcode.IFZ, self.step_ifz),
+            (Opcode.NEW, self.step_new),
+            (Opcode.INVOKE, self.step_invoke),
+        ):
+            self.dispatch_table[opcode] = step_function
+
     def step(self, state: AbstractState) -> List[AbstractState]:
         """
         return the next state list
         """
-        top_stack = state.stack[-1]
-        operation_json = top_stack.program_counter.get_current_operation()
-        opr_type: str = operation_json["opr"]
+        top_stack = state.get_method_stack()
+        instruction = top_stack.program_counter.get_current_instruction()
         next_state_list: List[AbstractState] = []
+        self.step_count += 1
 
-        match opr_type:
-            case "return":
-                return_type: None | str = operation_json["type"]
-                match return_type:
-                    case None:
-                        return_value = AbstractVariable(AbstractType.VOID)
+        new_state = self.dispatch_table[instruction.opcode](
+            state, top_stack, instruction
+        )
 
-                    case "int":
-                        return_value = top_stack.operate_stack.pop()
+        top_stack.program_counter.index += 1  # step 1
+        if new_state is not None:
+            new_state.stack[-1].program_counter.index += 1
+            next_state_list.append(new_state)
+        if len(state.stack) > 0:
+            next_state_list.append(state)
+            self.log_state(state)
+        else:
+            self.log_done(state)
 
-                    case _:
-                        raise Exception(return_type)
+        return next_state_list
 
-                if len(state.stack) > 1 and return_value.type != AbstractType.VOID:
-                    state.stack[-2].operate_stack.append(return_value)
-                else:
-                    state.return_value = return_value
-
-                self.log_operation(f"{opr_type} {return_type}")
-
-                # pop and return
-                state.stack.pop()
-
-            case "push":
-                value_json: Dict[str, Union[int, str]] = operation_json["value"]
-                value_type = value_json["type"]
-                match value_type:
-                    case "integer":
-                        value_value: int = value_json["value"]
-                        top_stack.operate_stack.append(AbstractVariable(value_value))
-                        self.log_operation(f"{opr_type} {value_value}")
-
-                    case _:
-                        raise Exception(value_type)
-
-            case "load":
-                load_type: str = operation_json["type"]
-                match load_type:
-                    case "int":
-                        load_index: int = operation_json["index"]
-                        top_stack.operate_stack.append(
-                            deepcopy(top_stack.local_variables[load_index])
-                        )
-                        self.log_operation(
-                            f"{opr_type}, type: {load_type}, index: {load_index}"
-                        )
+    def is_new_state(self, state: AbstractState) -> bool:
+        """
+        return False if a seen state covers the state, only checked at merge
+        points, where the paths meet again
+        """
+        program_counter = state.stack[-1].program_counter
+        control_flow_graph = program_counter.java_method.control_flow_graph
+        if not control_flow_graph.is_merge_point(program_counter.index):
+            return True
+        if self.state_index.add(state):
+            return True
+        self.log_drop(state)
+        return False
+
+    def step_return(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+    ) -> None | AbstractState:
+        return_type: None | str = instruction.type
+        match return_type:
+            case None:
+                return_value = AbstractVariable(AbstractType.VOID)
+
+            case "int":
+                return_value = top_stack.operate_stack.pop()
 
-                    case _:
-                        raise Exception(load_type)
-
-            case "store":
-                store_type = operation_json["type"]
-                store_index: int = operation_json["index"]
-                store_value = top_stack.operate_stack.pop()
-                match store_type:
-                    case "int":
-                        store_value.memory_id = store_index
-                        top_stack.local_variables[store_index] = store_value
-                        self.log_operation(f"{opr_type}, type: {store_type}")
-
-                    case _:
-                        raise Exception(store_type)
-
-            case "get":
-                field_json = operation_json["field"]
-                field_name: str = field_json["name"]
-                # hard code `$assertionsDisabled` to False
-                if field_name == "$assertionsDisabled":
-                    top_stack.operate_stack.append(False)
-                else:
-                    # TBD
-                    raise Exception
-                self.log_operation(f"{opr_type}, {field_name}")
-
-            case "binary":
-                binary_operant = operation_json["operant"]
-                binary_type = operation_json["type"]
-                operand_b = top_stack.operate_stack.pop()
-                operand_a = top_stack.operate_stack.pop()
-
-                match binary_operant:
-                    case "add":
-                        match binary_type:
-                            case "int":
-                                result = operand_a + operand_b
-                                top_stack.operate_stack.append(result)
-
-                            case _:
-                                raise Exception(binary_type)
-
-                    case "sub":
-                        match binary_type:
-                            case "int":
-                                result = operand_a - operand_b
-                                top_stack.operate_stack.append(result)
-
-                            case _:
-                                raise Exception(binary_type)
-
-                    case "div":
-                        match binary_type:
-                            case "int":
-                                if (
-                                    operand_b.type == AbstractType.INT
-                                    and operand_b.value == 0
-                                ):
-                                    # record the exception
-                                    exception_type = ExceptionType.ARITHMETIC_EXCEPTION
-                                    self.log_operation(
-                                        f"---find one exception---\n{exception_type}"
-                                    )
-                                    self.yes_exception_set.add(exception_type)
-                                    state.stack.clear()  # empty the stack, simply return
-                                    self.log_operation("exiting")
-                                elif (
-                                    operand_b.type == AbstractType.ANY_INT
-                                    or operand_b.type == AbstractType.NOT_NEGATIVE_INT
-                                    or operand_b.type == AbstractType.NOT_POSITIVE_INT
-                                ):
-                                    # record the exception
-                                    exception_type = ExceptionType.ARITHMETIC_EXCEPTION
-                                    self.log_operation(
-                                        f"---find one exception---\n{exception_type}"
-                                    )
-                                    self.yes_exception_set.add(exception_type)
-                                    result = operand_a / operand_b
-                                    top_stack.operate_stack.append(result)
-                                else:
-                                    result = operand_a / operand_b
-                                    top_stack.operate_stack.append(result)
-
-                    case _:
-                        raise Exception(binary_operant)
-
-                self.log_operation(f"{binary_operant} {binary_type}")
-
-            case "negate":
-                negate_type = operation_json["type"]
-                operand = top_stack.operate_stack.pop()
-                match negate_type:
-                    case "int":
-                        result = AbstractVariable(0) - operand
-
-                    case _:
-                        raise Exception(negate_type)
+            case _:
+                raise Exception(return_type)
 
-                top_stack.operate_stack.append(result)
+        if len(state.stack) > 1 and return_value.type != AbstractType.VOID:
+            state.get_method_stack(-2).operate_stack.append(return_value)
+        else:
+            state.return_value = return_value
 
-                self.log_operation(f"{opr_type}, {negate_type}")
+        self.log_operation("{} {}", instruction.opr, return_type)
 
-            case "incr":
-                incr_index: int = operation_json["index"]
-                incr_amount: int = operation_json["amount"]
-                incr_val = top_stack.local_variables[incr_index]
-                top_stack.local_variables[incr_index] = incr_val + AbstractVariable(
-                    incr_amount
-                )
+        # pop and return
+        state.stack.pop()
+
+    def step_push(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+    ) -> None | AbstractState:
+        if instruction.value is None:
+            raise Exception(instruction.type)
+        top_stack.operate_stack.append(instruction.value)
+        self.log_operation("{} {}", instruction.opr, instruction.value.value)
+
+    def step_load(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+    ) -> None | AbstractState:
+        load_type: str = instruction.type
+        match load_type:
+            case "int":
+                load_index: int = instruction.index
+                # the variables are immutable, no need to copy
+                top_stack.operate_stack.append(top_stack.local_variables[load_index])
                 self.log_operation(
-                    f"{opr_type}, index: {incr_index}, amount: {incr_amount}"
+                    "{}, type: {}, index: {}", instruction.opr, load_type, load_index
                 )
 
-            case "goto":
-                goto_target = operation_json["target"]
-                top_stack.program_counter.index = goto_target - 1
-                self.log_operation(f"{opr_type}, target: {goto_target}")
+            case _:
+                raise Exception(load_type)
 
-            case "if":
-                if_condition: str = operation_json["condition"]
-                if_target: int = operation_json["target"]
-                operand_b = top_stack.operate_stack.pop()
-                operand_a = top_stack.operate_stack.pop()
-                self.log_operation(
-                    f"{opr_type}, condition: {if_condition}, target: {if_target}"
+    def step_store(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+    ) -> None | AbstractState:
+        store_type: str = instruction.type
+        store_index: int = instruction.index
+        store_value = top_stack.operate_stack.pop()
+        match store_type:
+            case "int":
+                if top_stack.relations is not None:
+                    store_value = self.assign_relation(
+                        top_stack, store_index, store_value, instruction.relation
+                    )
+                top_stack.local_variables[store_index] = store_value.with_memory_id(
+                    store_index
                 )
-                match if_condition:
-                    case "gt":
-                        result = operand_a > operand_b
+                self.log_operation("{}, type: {}", instruction.opr, store_type)
 
-                    case "le":
-                        result = operand_a <= operand_b
+            case _:
+                raise Exception(store_type)
 
-                    case "ge":
-                        result = operand_a >= operand_b
+    def step_get(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+    ) -> None | AbstractState:
+        field_name: str = instruction.name
+        # hard code `$assertionsDisabled` to False
+        if field_name == "$assertionsDisabled":
+            top_stack.operate_stack.append(False)
+        else:
+            # TBD
+            raise Exception
+        self.log_operation("{}, {}", instruction.opr, field_name)
 
-                    case "lt":
-                        result = operand_a < operand_b
+    def step_binary(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+    ) -> None | AbstractState:
+        binary_operant: str = instruction.operant
+        binary_type: str = instruction.type
+        if binary_type != "int":
+            raise Exception(binary_type)
+        operand_b = top_stack.operate_stack.pop()
+        operand_a = top_stack.operate_stack.pop()
+
+        match binary_operant:
+            case "add" | "sub" | "mul":
+                result = operand_a.operate(operand_b, binary_operant)
+                if top_stack.relations is not None and instruction.relation is not None:
+                    result = self.refine_difference(
+                        top_stack, operand_a, operand_b, result, instruction.relation
+                    )
+                top_stack.operate_stack.append(result)
 
-                    case _:
-                        raise Exception(if_condition)
+            case "div" | "rem":
+                if operand_b.mask == ZERO_BIT:
+                    # record the exception
+                    exception_type = ExceptionType.ARITHMETIC_EXCEPTION
+                    self.log_operation("---find one exception---\n{}", exception_type)
+                    self.yes_exception_set.add(exception_type)
+                    state.stack.clear()  # empty the stack, simply return
+                    self.log_operation("exiting")
+                elif operand_b.mask & ZERO_BIT:
+                    # record the exception
+                    exception_type = ExceptionType.ARITHMETIC_EXCEPTION
+                    self.log_operation("---find one exception---\n{}", exception_type)
+                    self.yes_exception_set.add(exception_type)
+                    result = operand_a.operate(operand_b, binary_operant)
+                    top_stack.operate_stack.append(result)
+                else:
+                    result = operand_a.operate(operand_b, binary_operant)
+                    top_stack.operate_stack.append(result)
 
-                match result:
-                    case False:
-                        None  # do nothing
+            case _:
+                raise Exception(binary_operant)
 
-                    case True:
-                        top_stack.program_counter.index = if_target - 1
+        self.log_operation("{} {}", binary_operant, binary_type)
 
-                    case None:
-                        new_state = deepcopy(state)
-                        new_state.id = self.id_generator.get_new_id()
-                        self.log_operation(
-                            f"------create new state, id: {new_state.id}------"
-                        )
-                        self.log_state(new_state)
-                        next_state_list.append(new_state)
-
-                        top_stack.program_counter.index = if_target - 1
-
-                    case tuple():
-                        true_variables, false_variables = result
-                        false_state = deepcopy(state)
-                        false_state.id = self.id_generator.get_new_id()
-                        for variable in false_variables:
-                            if variable.memory_id != None:
-                                false_state.stack[-1].local_variables[
-                                    variable.memory_id
-                                ] = variable
-                        self.log_operation(
-                            f"------create new state, id: {false_state.id}------"
-                        )
-                        self.log_state(false_state)
-                        next_state_list.append(false_state)
-
-                        for variable in true_variables:
-                            if variable.memory_id != None:
-                                state.stack[-1].local_variables[
-                                    variable.memory_id
-                                ] = variable
-                        top_stack.program_counter.index = if_target - 1
-
-                    case _:
-                        raise Exception(result)
-
-            case "ifz":
-                operand = top_stack.operate_stack.pop()
-                if isinstance(operand, bool):
-                    if operand == True:
-                        operand = AbstractVariable(1)
-                    elif operand == False:
-                        operand = AbstractVariable(0)
-
-                ifz_condition = operation_json["condition"]
-                ifz_target = operation_json["target"]
+    def step_negate(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+    ) -> None | AbstractState:
+        negate_type: str = instruction.type
+        operand = top_stack.operate_stack.pop()
+        match negate_type:
+            case "int":
+                result = AbstractVariable(0) - operand
 
-                self.log_operation(
-                    f"{opr_type}, condition: {ifz_condition}, target: {ifz_target}"
-                )
-                match ifz_condition:
-                    case "ne":
-                        result = operand != AbstractVariable(0)
+            case _:
+                raise Exception(negate_type)
 
-                    case "le":
-                        result = operand <= AbstractVariable(0)
+        top_stack.operate_stack.append(result)
 
-                    case "gt":
-                        result = operand > AbstractVariable(0)
+        self.log_operation("{}, {}", instruction.opr, negate_type)
 
-                    case "eq":
-                        result = operand == AbstractVariable(0)
+    def step_incr(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+    ) -> None | AbstractState:
+        incr_index: int = instruction.index
+        incr_val = top_stack.local_variables[incr_index]
+        result = incr_val + instruction.value
+        if top_stack.relations is not None:
+            result = self.assign_relation(
+                top_stack, incr_index, result, (incr_index, instruction.value.value)
+            )
+        top_stack.local_variables[incr_index] = result.with_memory_id(incr_index)
+        self.log_operation(
+            "{}, index: {}, amount: {}",
+            instruction.opr,
+            incr_index,
+            instruction.value.value,
+        )
 
-                    case "lt":
-                        result = operand < AbstractVariable(0)
+    def step_goto(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+    ) -> None | AbstractState:
+        top_stack.program_counter.index = instruction.target - 1
+        self.log_operation("{}, target: {}", instruction.opr, instruction.target)
+
+    def step_if(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+    ) -> None | AbstractState:
+        operand_b = top_stack.operate_stack.pop()
+        operand_a = top_stack.operate_stack.pop()
+        self.log_operation(
+            "{}, condition: {}, target: {}",
+            instruction.opr,
+            instruction.condition,
+            instruction.target,
+        )
+        result = operand_a.compare(operand_b, instruction.condition)
+        if (
+            top_stack.relations is not None
+            and instruction.relation is not None
+            and not isinstance(result, bool)
+        ):
+            return self.branch_relations(state, top_stack, instruction, result)
+        return self.branch(state, top_stack, instruction.target, result)
+
+    def step_ifz(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+    ) -> None | AbstractState:
+        operand = top_stack.operate_stack.pop()
+        if isinstance(operand, bool):
+            if operand == True:
+                operand = AbstractVariable(1)
+            elif operand == False:
+                operand = AbstractVariable(0)
+
+        self.log_operation(
+            "{}, condition: {}, target: {}",
+            instruction.opr,
+            instruction.condition,
+            instruction.target,
+        )
+        result = operand.compare(AbstractVariable(0), instruction.condition)
+        return self.branch(state, top_stack, instruction.target, result)
 
-                    case _:
-                        raise Exception(ifz_condition)
+    def branch(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        target: int,
+        result: (
+            bool
+            | None
+            | Tuple[
+                Tuple[AbstractVariable, AbstractVariable],
+                Tuple[AbstractVariable, AbstractVariable],
+            ]
+        ),
+    ) -> None | AbstractState:
+        """
+        jump to the target if the result is true,
+        return the new state of the false branch if the result is unknown
+        """
+        match result:
+            case False:
+                return None
+
+            case True:
+                top_stack.program_counter.index = target - 1
+                return None
+
+            case None:
+                new_state = state.fork(self.id_generator.get_new_id())
+                self.log_operation("------create new state, id: {}------", new_state.id)
+                self.log_state(new_state)
+
+                top_stack.program_counter.index = target - 1
+                return new_state
+
+            case tuple():
+                true_variables, false_variables = result
+                false_state = state.fork(self.id_generator.get_new_id())
+                for variable in false_variables:
+                    if variable.memory_id != None:
+                        false_state.stack[-1].local_variables[
+                            variable.memory_id
+                        ] = variable
+                self.log_operation(
+                    "------create new state, id: {}------", false_state.id
+                )
+                self.log_state(false_state)
 
-                match result:
-                    case False:
-                        None  # do nothing
+                for variable in true_variables:
+                    if variable.memory_id != None:
+                        top_stack.local_variables[variable.memory_id] = variable
+                top_stack.program_counter.index = target - 1
+                return false_state
 
-                    case True:
-                        top_stack.program_counter.index = ifz_target - 1
+            case _:
+                raise Exception(result)
 
-                    case None:
-                        new_state = deepcopy(state)
-                        new_state.id = self.id_generator.get_new_id()
-                        self.log_operation(
-                            f"------create new state, id: {new_state.id}------"
-                        )
-                        self.log_state(new_state)
-                        next_state_list.append(new_state)
-
-                        top_stack.program_counter.index = ifz_target - 1
-
-                    case tuple():
-                        true_variables, false_variables = result
-                        false_state = deepcopy(state)
-                        false_state.id = self.id_generator.get_new_id()
-                        for variable in false_variables:
-                            if variable.memory_id != None:
-                                false_state.stack[-1].local_variables[
-                                    variable.memory_id
-                                ] = variable
-                        self.log_operation(
-                            f"------create new state, id: {false_state.id}------"
-                        )
-                        self.log_state(false_state)
-                        next_state_list.append(false_state)
-
-                        for variable in true_variables:
-                            if variable.memory_id != None:
-                                state.stack[-1].local_variables[
-                                    variable.memory_id
-                                ] = variable
-                        top_stack.program_counter.index = ifz_target - 1
-
-                    case _:
-                        raise Exception(result)
-
-            case "new":
-                class_name = operation_json["class"]
-                # hard code new `java/lang/AssertionError`
-                if class_name == "java/lang/AssertionError":
-                    self.log_operation(f"thorw AssertionError!")
-                    # simply return
-                    state.stack.clear()
-                else:
-                    # TBD
-                    raise Exception
+    def get_relation_bounds(
+        self, top_stack: AbstractMethodStack, index: int, variable: AbstractVariable
+    ) -> Tuple[int, int]:
+        """
+        the bounds of the local variable, narrowed by the relations
+        """
+        low, high = top_stack.relations.get_bounds(index)
+        return (
+            int(low) if low > variable.low else variable.low,
+            int(high) if high < variable.high else variable.high,
+        )
 
-            case _:
-                raise Exception(opr_type)
+    def assign_relation(
+        self,
+        top_stack: AbstractMethodStack,
+        index: int,
+        value: AbstractVariable,
+        relation: None | Tuple[int, int],
+    ) -> AbstractVariable:
+        """
+        x_index := value in the relations, and x_index := x_j + c if the relation
+        is (j, c) and the addition can not overflow,
+        return the value narrowed by the relations
+        """
+        if value.type == AbstractType.BOTTOM:
+            top_stack.relations.forget(index)
+            return value
+        variable = (
+            None if relation is None else top_stack.local_variables.get(relation[0])
+        )
+        if variable is not None and variable.type != AbstractType.BOTTOM:
+            j, c = relation
+            low, high = self.get_relation_bounds(top_stack, j, variable)
+            if low + c >= INT_MIN and high + c <= INT_MAX:
+                top_stack.relations.assign_linear(index, j, c)
+                top_stack.relations.meet_bounds(index, value.low, value.high)
+                low, high = self.get_relation_bounds(top_stack, index, value)
+                return AbstractVariable.from_interval(low, high, mask=value.mask)
+        top_stack.relations.assign_bounds(index, value.low, value.high)
+        return value
+
+    def refine_difference(
+        self,
+        top_stack: AbstractMethodStack,
+        operand_a: AbstractVariable,
+        operand_b: AbstractVariable,
+        result: AbstractVariable,
+        relation: Tuple[int, int],
+    ) -> AbstractVariable:
+        """
+        narrow x_a - x_b to the bounds of the relations, if it can not overflow
+        """
+        if (
+            result.type == AbstractType.BOTTOM
+            or operand_a.type == AbstractType.BOTTOM
+            or operand_b.type == AbstractType.BOTTOM
+        ):
+            return result
+        a, b = relation
+        low_a, high_a = self.get_relation_bounds(top_stack, a, operand_a)
+        low_b, high_b = self.get_relation_bounds(top_stack, b, operand_b)
+        low, high = top_stack.relations.get_difference_bounds(a, b)
+        # the exact difference, before it wraps around
+        low = max(low, low_a - high_b)
+        high = min(high, high_a - low_b)
+        if low < INT_MIN or high > INT_MAX:
+            return result
+        if low <= result.low and high >= result.high:
+            return result
+        return AbstractVariable.from_interval(
+            max(int(low), result.low), min(int(high), result.high), mask=result.mask
+        )
 
-        top_stack.program_counter.index += 1  # step 1
-        for new_state in next_state_list:
-            new_state.stack[-1].program_counter.index += 1
-        if len(state.stack) > 0:
-            next_state_list.append(state)
-            self.log_state(state)
+    def branch_relations(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+        result: (
+            None
+            | Tuple[
+                Tuple[AbstractVariable, AbstractVariable],
+                Tuple[AbstractVariable, AbstractVariable],
+            ]
+        ),
+    ) -> None | AbstractState:
+        """
+        branch on the comparison of two local variables, a branch the relations
+        rule out is not taken
+        """
+        a, b = instruction.relation
+        condition: str = instruction.condition
+        true_variables, false_variables = ((), ()) if result is None else result
+        true_stack = top_stack.copy()
+        is_true = true_stack.constrain(
+            true_variables, get_condition_constraints(condition, a, b)
+        )
+        false_stack = top_stack.copy()
+        is_false = false_stack.constrain(
+            false_variables,
+            get_condition_constraints(NEGATED_CONDITION_DICT[condition], a, b),
+        )
+        if condition == "ne" and is_true:
+            is_true = true_stack.relations.get_difference_bounds(a, b) != (0, 0)
+        elif condition == "eq" and is_false:
+            is_false = false_stack.relations.get_difference_bounds(a, b) != (0, 0)
+        if not is_true and not is_false:
+            # the relations hold no state here, leave it to the intervals
+            return self.branch(state, top_stack, instruction.target, result)
+
+        new_state = None
+        if is_false:
+            if is_true:
+                new_state = state.fork(self.id_generator.get_new_id())
+                self.log_operation("------create new state, id: {}------", new_state.id)
+                new_top_stack = new_state.stack[-1]
+            else:
+                new_top_stack = top_stack
+            new_top_stack.local_variables = false_stack.local_variables
+            new_top_stack.relations = false_stack.relations
+            if new_state is not None:
+                self.log_state(new_state)
+        if is_true:
+            top_stack.local_variables = true_stack.local_variables
+            top_stack.relations = true_stack.relations
+            top_stack.program_counter.index = instruction.target - 1
+        return new_state
+
+    def step_new(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+    ) -> None | AbstractState:
+        class_name: str = instruction.name
+        # hard code new `java/lang/AssertionError`
+        if class_name == "java/lang/AssertionError":
+            self.log_operation("thorw AssertionError!")
+            # simply return
+            state.stack.clear()
         else:
-            self.log_done(state)
+            # TBD
+            raise Exception
 
-        return next_state_list
+    def step_invoke(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+    ) -> None | AbstractState:
+        if instruction.type != "static":
+            raise Exception(instruction.type)
+        class_name, arg_types, return_type = instruction.method
+        if class_name not in self.java_program.java_class_dict:
+            raise Exception(class_name)
+        java_method = self.java_program.java_class_dict[class_name].get_method(
+            instruction.name, arg_types
+        )
+
+        arguments: List[AbstractVariable] = []
+        for _ in arg_types:
+            argument = top_stack.operate_stack.pop()
+            if isinstance(argument, bool):
+                argument = AbstractVariable(1 if argument else 0)
+            arguments.append(argument.with_memory_id(None))
+        arguments.reverse()
+
+        # join the arguments only when they are traced
+        if self.tracer.level >= TraceLevel.INSTRUCTION:
+            self.log_operation(
+                "{}, {}.{}, arguments: [{}]",
+                instruction.opr,
+                class_name,
+                instruction.name,
+                ", ".join(str(x) for x in arguments),
+            )
+        summary = self.get_summary(java_method, arguments, return_type)
+
+        for exception_type in summary.exception_set:
+            self.log_operation("---find one exception---\n{}", exception_type)
+            self.yes_exception_set.add(exception_type)
+        if summary.return_value is None:
+            # the callee never returns, simply return
+            self.log_operation("exiting")
+            state.stack.clear()
+        elif summary.return_value.type != AbstractType.VOID:
+            top_stack.operate_stack.append(summary.return_value.with_memory_id(None))
+
+    def get_summary(
+        self,
+        java_method: JavaMethod,
+        arguments: List[AbstractVariable],
+        return_type: None | str,
+    ) -> MethodSummary:
+        """
+        look up the summary of the call, analyse the callee if it is missing
+        """
+        summary_table = self.java_program.summary_table
+        if len(summary_table.call_stack) >= summary_table.depth_limit:
+            arguments = [AbstractVariable(AbstractType.ANY_INT) for _ in arguments]
+        key = (
+            ABSTRACT_MODE,
+            java_method.class_id,
+            java_method.id,
+            java_method.get_arg_types(),
+            tuple(x.get_key() for x in arguments),
+        )
+        summary = summary_table.get(key)
+        if summary is not None:
+            return summary
+
+        if key in summary_table.call_stack:
+            # a recursive call, the exceptions are found by the outer analysis
+            # of the same call, and the return value can be anything
+            if return_type is None:
+                return MethodSummary(AbstractVariable(AbstractType.VOID), set())
+            return MethodSummary(AbstractVariable(AbstractType.ANY_INT), set())
+
+        summary_table.call_stack.append(key)
+        try:
+            callee_interpreter = FixpointInterpreter(
+                self.java_program,
+                arguments,
+                tracer=self.tracer,
+                init_method=java_method,
+            )
+            callee_interpreter.run()
+        finally:
+            summary_table.call_stack.pop()
+        summary = MethodSummary(
+            callee_interpreter.return_value,
+            set(callee_interpreter.yes_exception_set),
+        )
+        summary_table.put(key, summary)
+        return summary
 
-    def log_operation(self, log_str: str) -> None:
-        print("Operation:", log_str)
+    def step_unsupported(
+        self,
+        state: AbstractState,
+        top_stack: AbstractMethodStack,
+        instruction: Instruction,
+    ) -> None | AbstractState:
+        raise Exception(instruction.opr)
+
+    def log_operation(self, log_format: str, *args: object) -> None:
+        """
+        the arguments are only formatted when instructions are traced
+        """
+        if self.tracer.level < TraceLevel.INSTRUCTION:
+            return
+        log_str = log_format.format(*args)
+        self.tracer.emit("operation", f"Operation: {log_str}", text=log_str)
 
     def log_start(self) -> None:
-        print("---starting program---")
-        print("init class:", self.java_program.init_class_name)
-        print("init method:", self.java_program.init_method_name)
-        print()
+        if self.tracer.level < TraceLevel.SUMMARY:
+            return
+        init_class_name = self.init_method.class_id
+        init_method_name = self.init_method.id
+        self.tracer.emit(
+            "start",
+            f"---starting program---\n"
+            f"init class: {init_class_name}\n"
+            f"init method: {init_method_name}\n",
+            init_class=init_class_name,
+            init_method=init_method_name,
+        )
 
     def log_state(self, state: AbstractState) -> None:
-        print("---state---  id:", state.id)
-        print("stack size:", len(state.stack))
-        print("top stack")
+        if self.tracer.level < TraceLevel.STATE:
+            return
         top_stack = state.stack[-1]
         var_str = ""
         for i in top_stack.local_variables.keys():
             var_str += f"{i}: {top_stack.local_variables[i]}"
             if i != len(top_stack.local_variables) - 1:
                 var_str += ", "
-        print(" ", "local variables:", f"{{{var_str}}}")
-        print(
-            " ",
-            "operate stack:",
-            f"[{', '.join(str(x) for x in top_stack.operate_stack)}]",
+        stack_str = ", ".join(str(x) for x in top_stack.operate_stack)
+        self.tracer.emit(
+            "state",
+            f"---state---  id: {state.id}\n"
+            f"stack size: {len(state.stack)}\n"
+            f"top stack\n"
+            f"  local variables: {{{var_str}}}\n"
+            f"  operate stack: [{stack_str}]\n"
+            f"  program counter index: {top_stack.program_counter.index}\n",
+            id=state.id,
+            stack_size=len(state.stack),
+            local_variables={
+                str(i): str(x) for i, x in top_stack.local_variables.items()
+            },
+            operate_stack=[str(x) for x in top_stack.operate_stack],
+            program_counter=top_stack.program_counter.index,
         )
-        print(" ", "program counter index:", top_stack.program_counter.index)
-        print()
 
     def log_done(self, state: AbstractState) -> None:
-        print("---final state---  id:", state.id)
-        print("stack size:", len(state.stack))
-        print("return value:", str(state.return_value))
-        print()
+        if self.tracer.level < TraceLevel.STATE:
+            return
+        self.tracer.emit(
+            "done",
+            f"---final state---  id: {state.id}\n"
+            f"stack size: {len(state.stack)}\n"
+            f"return value: {state.return_value}\n",
+            id=state.id,
+            stack_size=len(state.stack),
+            return_value=str(state.return_value),
+        )
+
+    def log_drop(self, state: AbstractState) -> None:
+        if self.tracer.level < TraceLevel.STATE:
+            return
+        self.tracer.emit(
+            "drop",
+            f"---covered state dropped---  id: {state.id}\n",
+            id=state.id,
+        )
+
+    def log_step_limit(self) -> None:
+        if self.tracer.level < TraceLevel.SUMMARY:
+            return
+        self.tracer.emit("step_limit", "Reach the step limit, exit!")
 
     def log_exception(self) -> None:
-        print("---exception---")
-        print("Yes Exception:")
-        for exception_type in self.yes_exception_set:
-            print(" ", exception_type)
-        print()
+        if self.tracer.level < TraceLevel.SUMMARY:
+            return
+        exception_str = "".join(
+            f"  {exception_type}\n" for exception_type in self.yes_exception_set
+        )
+        self.tracer.emit(
+            "exception",
+            f"---exception---\nYes Exception:\n{exception_str}",
+            yes_exceptions=[x.value for x in self.yes_exception_set],
+        )
 
     def run(self, step_limit: int) -> None:
-        self.log_start()
-
-        index = 0
-        while len(self.state_list) > 0 and index < step_limit:
-            index += 1
+        """
+        step_limit: the number of states stepped before giving up
+        """
+        try:
+            self.log_start()
 
-            next_state_list: List[AbstractState] = []
             for state in self.state_list:
-                next_state_list += self.step(state)
-            self.state_list = next_state_list
+                self.scheduler.push(state)
+            self.state_list.clear()
+
+            while len(self.scheduler) > 0 and self.step_count < step_limit:
+                state = self.scheduler.pop()
+                for next_state in self.step(state):
+                    if self.is_new_state(next_state):
+                        self.scheduler.push(next_state)
+                self.peak_frontier_size = max(
+                    self.peak_frontier_size, len(self.scheduler)
+                )
+
+            if len(self.scheduler) > 0:
+                self.log_step_limit()
 
-        if index == step_limit:
-            print("Reach the step limit, exit!")
+            self.log_exception()
+        finally:
+            self.tracer.flush()
+            self.scheduler.close()
 
-        self.log_exception()
+
+class FixpointInterpreter(AbstractInterpreter):
+    """
+    keep one abstract method stack per program point of the init method,
+    join the incoming stacks and iterate a worklist to a fixpoint
+    """
+
+    def __init__(
+        self,
+        java_program: JavaProgram,
+        init_peremeters: List[AbstractVariable],
+        widening_delay: int = 2,
+        narrowing_passes: int = 2,
+        tracer: None | Tracer = None,
+        init_method: None | JavaMethod = None,
+    ) -> None:
+        """
+        widening_delay: the number of plain joins at a loop head before widening
+        narrowing_passes: the number of descending passes after the fixpoint
+        """
+        super().__init__(java_program, init_peremeters, tracer, init_method)
+        self.control_flow_graph = self.init_method.control_flow_graph
+        self.thresholds = self.control_flow_graph.get_thresholds()
+        self.widening_delay = widening_delay
+        self.narrowing_passes = narrowing_passes
+        init_state = self.state_list.pop()
+        self.init_frame = init_state.stack[-1]
+        self.frame_dict: Dict[int, AbstractMethodStack] = {0: self.init_frame}
+        self.worklist: List[Tuple[int, int]] = []
+        self.worklist_set: Set[int] = set()
+        self.add_work(0)
+        self.return_value: None | AbstractVariable = None
+        self.iteration_count = 0
+        # the number of times each loop head has been updated
+        self.loop_head_count_dict: Dict[int, int] = {}
+
+    def add_work(self, index: int) -> None:
+        if index in self.worklist_set:
+            return
+        self.worklist_set.add(index)
+        # process in reverse post order, so a merge point sees its inputs first
+        heapq.heappush(
+            self.worklist, (self.control_flow_graph.order_dict[index], index)
+        )
+
+    def pop_work(self) -> int:
+        _, index = heapq.heappop(self.worklist)
+        self.worklist_set.remove(index)
+        return index
+
+    def propagate(self, index: int, frame: AbstractMethodStack) -> None:
+        """
+        join the frame into the frame of the program point
+        """
+        old_frame = self.frame_dict.get(index)
+        if old_frame is None:
+            self.frame_dict[index] = frame
+        elif old_frame.includes(frame):
+            return
+        elif self.control_flow_graph.is_loop_head(index):
+            count = self.loop_head_count_dict.get(index, 0) + 1
+            self.loop_head_count_dict[index] = count
+            if count > self.widening_delay:
+                self.frame_dict[index] = old_frame.widen(frame, self.thresholds)
+            else:
+                self.frame_dict[index] = old_frame.join(frame)
+        else:
+            self.frame_dict[index] = old_frame.join(frame)
+        self.add_work(index)
+
+    def step_frame(self, index: int) -> List[AbstractMethodStack]:
+        """
+        step the frame of the program point,
+        return the frames of the successors
+        """
+        frame = self.frame_dict[index].copy()
+        is_return = (
+            frame.program_counter.get_current_instruction().opcode == Opcode.RETURN
+        )
+        state = AbstractState(self.id_generator.get_new_id(), [frame])
+        next_frames = [next_state.stack[-1] for next_state in self.step(state)]
+
+        if is_return and len(state.stack) == 0:
+            if self.return_value is None:
+                self.return_value = state.return_value
+            else:
+                self.return_value = self.return_value.join(state.return_value)
+
+        return next_frames
+
+    def apply_frames(self) -> Dict[int, AbstractMethodStack]:
+        """
+        step every program point once and join the outgoing frames,
+        the exceptions and the return value are recomputed on the way
+        """
+        self.yes_exception_set.clear()
+        self.return_value = None
+        new_frame_dict: Dict[int, AbstractMethodStack] = {0: self.init_frame}
+        for index in self.control_flow_graph.reverse_post_order:
+            if index not in self.frame_dict:
+                continue
+            for next_frame in self.step_frame(index):
+                next_index = next_frame.program_counter.index
+                old_frame = new_frame_dict.get(next_index)
+                if old_frame is None:
+                    new_frame_dict[next_index] = next_frame
+                else:
+                    new_frame_dict[next_index] = old_frame.join(next_frame)
+        return new_frame_dict
+
+    def narrow(self) -> None:
+        """
+        descending passes which recover the precision lost by widening
+        """
+        for _ in range(self.narrowing_passes):
+            new_frame_dict = self.apply_frames()
+            for index in list(self.frame_dict.keys()):
+                new_frame = new_frame_dict.get(index)
+                if new_frame is None:
+                    del self.frame_dict[index]
+                elif self.control_flow_graph.is_loop_head(index):
+                    self.frame_dict[index] = self.frame_dict[index].narrow(new_frame)
+                else:
+                    self.frame_dict[index] = new_frame
+        # the results of the final frames
+        self.apply_frames()
+
+    def run(self, step_limit: None | int = None) -> None:
+        try:
+            self.log_start()
+
+            while len(self.worklist) > 0:
+                if step_limit is not None and self.iteration_count >= step_limit:
+                    self.log_step_limit()
+                    break
+                self.iteration_count += 1
+                self.peak_frontier_size = max(
+                    self.peak_frontier_size, len(self.worklist)
+                )
+
+                index = self.pop_work()
+                for next_frame in self.step_frame(index):
+                    self.propagate(next_frame.program_counter.index, next_frame)
+
+            if len(self.worklist) == 0:
+                self.narrow()
+
+            self.log_fixpoint()
+            self.log_exception()
+        finally:
+            self.tracer.flush()
+
+    def log_fixpoint(self) -> None:
+        if self.tracer.level < TraceLevel.SUMMARY:
+            return
+        self.tracer.emit(
+            "fixpoint",
+            f"---fixpoint---\n"
+            f"iterations: {self.iteration_count}\n"
+            f"program points: {len(self.frame_dict)}\n"
+            f"return value: {self.return_value}\n",
+            iterations=self.iteration_count,
+            program_points=len(self.frame_dict),
+            return_value=str(self.return_value),
+        )
 
 
 # test code
@@ -0,0 +1,316 @@
+from __future__ import annotations
+from typing import List, Dict, Tuple, Union
+from enum import Enum
+from fnmatch import fnmatch
+from multiprocessing import Pool, TimeoutError
+import argparse
+import json
+import os
+import signal
+import time
+
+import AbstractInterpreter as abstract_interpreter
+from AbstractInterpreter import AbstractMode, FixpointInterpreter, JavaProgram
+from program_snapshot import load_program
+from results_store import ResultsStore, get_config_json, get_method_key
+from tracing import TraceLevel, Tracer
+
+
+class CaseStatus(Enum):
+    DONE = "Done"
+    TIMEOUT = "Timeout"
+    ERROR = "Error"
+
+
+class CaseResult:
+    def __init__(self, class_name: str, method_name: str) -> None:
+        self.class_name = class_name
+        self.method_name = method_name
+        self.status = CaseStatus.DONE
+        self.exceptions: List[str] = []
+        self.return_value: None | str = None
+        self.error: None | str = None
+        self.seconds = 0.0
+        # read from the results store instead of analysed
+        self.cached = False
+
+    def to_json(self) -> Dict[str, Union[None, str, float, List[str]]]:
+        return {
+            "class": self.class_name,
+            "method": self.method_name,
+            "status": self.status.value,
+            "exceptions": self.exceptions,
+            "return_value": self.return_value,
+            "error": self.error,
+            "seconds": self.seconds,
+            "cached": self.cached,
+        }
+
+    @staticmethod
+    def from_json(result_json: Dict) -> CaseResult:
+        result = CaseResult(result_json["class"], result_json["method"])
+        result.status = CaseStatus(result_json["status"])
+        result.exceptions = result_json["exceptions"]
+        result.return_value = result_json["return_value"]
+        result.error = result_json["error"]
+        result.seconds = result_json["seconds"]
+        result.cached = result_json.get("cached", False)
+        return result
+
+
+class BatchReport:
+    def __init__(self, abstract_mode: AbstractMode) -> None:
+        self.abstract_mode = abstract_mode
+        self.results: List[CaseResult] = []
+        self.seconds = 0.0
+
+    def count(self, status: CaseStatus) -> int:
+        return sum(1 for result in self.results if result.status == status)
+
+    def to_json(self) -> Dict:
+        return {
+            "abstract_mode": self.abstract_mode.value,
+            "seconds": self.seconds,
+            "done": self.count(CaseStatus.DONE),
+            "timeout": self.count(CaseStatus.TIMEOUT),
+            "error": self.count(CaseStatus.ERROR),
+            "cached": sum(1 for result in self.results if result.cached),
+            "results": [result.to_json() for result in self.results],
+        }
+
+    def log_report(self) -> None:
+        print("---batch report---")
+        print("abstract mode:", self.abstract_mode.value)
+        for result in self.results:
+            print(
+                f"{result.class_name}.{result.method_name}:",
+                result.status.value,
+                result.exceptions if result.status == CaseStatus.DONE else result.error,
+            )
+        print(
+            "done:",
+            self.count(CaseStatus.DONE),
+            "timeout:",
+            self.count(CaseStatus.TIMEOUT),
+            "error:",
+            self.count(CaseStatus.ERROR),
+            "cached:",
+            sum(1 for result in self.results if result.cached),
+        )
+        print("seconds:", round(self.seconds, 3))
+        print()
+
+
+# the time to start the workers and send them the program
+POOL_GRACE_SECONDS = 5.0
+
+
+class AnalysisTimeout(Exception):
+    pass
+
+
+# the program loaded in each worker process
+worker_program: None | JavaProgram = None
+worker_timeout: float = 0.0
+
+
+def init_worker(
+    java_program: JavaProgram, abstract_mode: AbstractMode, timeout: float
+) -> None:
+    global worker_program, worker_timeout
+    worker_program = java_program
+    worker_timeout = timeout
+    abstract_interpreter.ABSTRACT_MODE = abstract_mode
+
+
+def raise_timeout(signum: int, frame: object) -> None:
+    raise AnalysisTimeout
+
+
+def analyse_case(class_name: str, method_name: str) -> CaseResult:
+    """
+    run the fixpoint interpreter on one method in the worker process
+    """
+    result = CaseResult(class_name, method_name)
+    start_time = time.perf_counter()
+    # SIGALRM stops the method in time where the platform has it,
+    # otherwise the parent process gives up on the result
+    use_alarm = hasattr(signal, "setitimer") and worker_timeout > 0
+    if use_alarm:
+        signal.signal(signal.SIGALRM, raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, worker_timeout)
+    try:
+        worker_program.set_init_method(class_name, method_name)
+        java_interpreter = FixpointInterpreter(
+            worker_program,
+            worker_program.init_method.get_init_parameters(),
+            tracer=Tracer(TraceLevel.OFF),
+        )
+        java_interpreter.run()
+        result.exceptions = sorted(
+            exception_type.value
+            for exception_type in java_interpreter.yes_exception_set
+        )
+        result.return_value = str(java_interpreter.return_value)
+    except AnalysisTimeout:
+        result.status = CaseStatus.TIMEOUT
+    except Exception as exception:
+        result.status = CaseStatus.ERROR
+        result.error = repr(exception)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    result.seconds = time.perf_counter() - start_time
+    return result
+
+
+def filter_case_names(
+    case_names: List[Tuple[str, str]], patterns: None | List[str]
+) -> List[Tuple[str, str]]:
+    """
+    keep the cases whose "class.method" matches one of the glob patterns
+    """
+    if not patterns:
+        return case_names
+    return [
+        (class_name, method_name)
+        for class_name, method_name in case_names
+        if any(fnmatch(f"{class_name}.{method_name}", x) for x in patterns)
+    ]
+
+
+def analyse_all_cases(
+    java_program: JavaProgram,
+    patterns: None | List[str] = None,
+    processes: None | int = None,
+    timeout: float = 10.0,
+    abstract_mode: None | AbstractMode = None,
+    results_store: None | ResultsStore = None,
+) -> BatchReport:
+    """
+    analyse every "@Case" method matching the patterns in a process pool,
+    each method gets at most timeout seconds,
+    the abstract mode is the current ABSTRACT_MODE by default,
+    the methods whose code is unchanged since they were put in the results store
+    are not analysed again
+    """
+    if abstract_mode is None:
+        abstract_mode = abstract_interpreter.ABSTRACT_MODE
+    report = BatchReport(abstract_mode)
+    start_time = time.perf_counter()
+    all_case_names = filter_case_names(java_program.get_case_names(), patterns)
+    case_names = all_case_names
+
+    result_dict: Dict[Tuple[str, str], CaseResult] = {}
+    key_dict: Dict[Tuple[str, str], str] = {}
+    if results_store is not None:
+        config_json = get_config_json(abstract_mode, FixpointInterpreter.__name__)
+        for class_name, method_name in case_names:
+            java_method = java_program.java_class_dict[class_name].method_dict[
+                method_name
+            ]
+            try:
+                key = get_method_key(java_program, java_method, config_json)
+            except Exception:
+                # a callee is missing, always analyse it
+                continue
+            key_dict[(class_name, method_name)] = key
+            result_json = results_store.get(key)
+            if result_json is not None:
+                result = CaseResult.from_json(result_json)
+                result.cached = True
+                result_dict[(class_name, method_name)] = result
+        case_names = [x for x in case_names if x not in result_dict]
+
+    pool = Pool(processes, init_worker, (java_program, abstract_mode, timeout))
+    # the latest time every method is done if none of them takes longer than timeout
+    process_count = processes if processes is not None else os.cpu_count() or 1
+    deadline = (
+        start_time
+        + timeout * (len(case_names) / process_count + 1)
+        + POOL_GRACE_SECONDS
+    )
+    try:
+        async_results = [
+            pool.apply_async(analyse_case, case_name) for case_name in case_names
+        ]
+        for (class_name, method_name), async_result in zip(case_names, async_results):
+            try:
+                result = async_result.get(max(0.0, deadline - time.perf_counter()))
+            except TimeoutError:
+                result = CaseResult(class_name, method_name)
+                result.status = CaseStatus.TIMEOUT
+            result_dict[(class_name, method_name)] = result
+    finally:
+        # kill the workers still stuck in a method
+        pool.terminate()
+        pool.join()
+
+    for case_name, result in result_dict.items():
+        key = key_dict.get(case_name)
+        # a timeout may not happen again with more time
+        if (
+            key is not None
+            and not result.cached
+            and result.status != CaseStatus.TIMEOUT
+        ):
+            results_store.put(key, result.to_json())
+    # in the order of the cases
+    report.results = [result_dict[case_name] for case_name in all_case_names]
+    report.seconds = time.perf_counter() - start_time
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='analyse every "@Case" method of a project in parallel'
+    )
+    parser.add_argument("project_name")
+    parser.add_argument(
+        "-j", "--json-directory", help="read the json converted before from here"
+    )
+    parser.add_argument(
+        "-f",
+        "--filter",
+        action="append",
+        help='glob pattern of "class.method" to analyse, may be repeated',
+    )
+    parser.add_argument("-p", "--processes", type=int, default=None)
+    parser.add_argument("-t", "--timeout", type=float, default=10.0)
+    parser.add_argument(
+        "-m",
+        "--mode",
+        choices=[abstract_mode.name for abstract_mode in AbstractMode],
+        default=abstract_interpreter.ABSTRACT_MODE.name,
+    )
+    parser.add_argument("-o", "--output", help="write the report as json")
+    parser.add_argument(
+        "-s", "--store", help="reuse and save the results of unchanged methods"
+    )
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="load the program from its snapshot while the class files are unchanged",
+    )
+    args = parser.parse_args()
+
+    java_program = (
+        load_program(args.project_name, json_directory=args.json_directory)
+        if args.snapshot
+        else JavaProgram(args.project_name, json_directory=args.json_directory)
+    )
+    results_store = None if args.store is None else ResultsStore(args.store)
+    batch_report = analyse_all_cases(
+        java_program,
+        args.filter,
+        args.processes,
+        args.timeout,
+        AbstractMode[args.mode],
+        results_store,
+    )
+    if results_store is not None:
+        results_store.save()
+    batch_report.log_report()
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(batch_report.to_json(), f, indent=4)
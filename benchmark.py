@@ -0,0 +1,278 @@
+from __future__ import annotations
+from typing import List, Dict, Tuple, Union
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+import AbstractInterpreter as abstract_interpreter
+from AbstractInterpreter import (
+    AbstractInterpreter,
+    AbstractMode,
+    FixpointInterpreter,
+    JavaProgram,
+    SummaryTable,
+)
+from tracing import TraceLevel, Tracer
+
+# the bundled corpora, the name and the directory of the json files
+CORPUS_LIST: List[Tuple[str, str]] = [
+    ("json", "json"),
+    ("decompiled", "course-02242-examples/decompiled"),
+]
+
+ENGINE_DICT = {
+    "forking": AbstractInterpreter,
+    "fixpoint": FixpointInterpreter,
+}
+
+# the states the forking interpreter steps in one method
+STEP_LIMIT = 1000
+# a result is a regression when it is this much worse than the baseline
+REGRESSION_RATIO = 0.2
+# runs shorter than this are too noisy to compare
+MIN_COMPARED_SECONDS = 0.005
+
+
+class BenchmarkResult:
+    def __init__(
+        self,
+        engine_name: str,
+        corpus_name: str,
+        class_name: str,
+        method_name: str,
+        mode: AbstractMode,
+    ) -> None:
+        self.engine_name = engine_name
+        self.corpus_name = corpus_name
+        self.class_name = class_name
+        self.method_name = method_name
+        self.mode = mode
+        self.error: None | str = None
+        self.instructions = 0
+        self.states = 0
+        self.peak_frontier = 0
+        self.peak_memory = 0
+        # the best time of the repeated runs
+        self.seconds = 0.0
+
+    def get_key(self) -> str:
+        return (
+            f"{self.engine_name}:{self.corpus_name}:"
+            f"{self.class_name}.{self.method_name}:{self.mode.name}"
+        )
+
+    def get_instructions_per_second(self) -> float:
+        return self.instructions / self.seconds if self.seconds > 0 else 0.0
+
+    def to_json(self) -> Dict[str, Union[None, str, int, float]]:
+        return {
+            "engine": self.engine_name,
+            "corpus": self.corpus_name,
+            "class": self.class_name,
+            "method": self.method_name,
+            "mode": self.mode.name,
+            "error": self.error,
+            "instructions": self.instructions,
+            "states": self.states,
+            "peak_frontier": self.peak_frontier,
+            "peak_memory": self.peak_memory,
+            "seconds": self.seconds,
+            "instructions_per_second": self.get_instructions_per_second(),
+        }
+
+
+def run_method(
+    java_program: JavaProgram,
+    engine: type,
+    class_name: str,
+    method_name: str,
+) -> Tuple[None | AbstractInterpreter, None | str]:
+    """
+    analyse the method from a clean summary table with tracing off,
+    return the interpreter and the error, if any
+    """
+    java_program.summary_table = SummaryTable()
+    java_program.set_init_method(class_name, method_name)
+    java_interpreter = None
+    try:
+        java_interpreter = engine(
+            java_program,
+            java_program.init_method.get_init_parameters(),
+            tracer=Tracer(TraceLevel.OFF),
+        )
+        if engine is FixpointInterpreter:
+            java_interpreter.run()
+        else:
+            java_interpreter.run(STEP_LIMIT)
+    except Exception as exception:
+        return java_interpreter, repr(exception)
+    return java_interpreter, None
+
+
+def benchmark_method(
+    java_program: JavaProgram,
+    engine: type,
+    result: BenchmarkResult,
+    repeat: int,
+) -> None:
+    best_seconds = None
+    for _ in range(repeat):
+        gc.collect()
+        start_time = time.perf_counter()
+        java_interpreter, error = run_method(
+            java_program, engine, result.class_name, result.method_name
+        )
+        seconds = time.perf_counter() - start_time
+        if best_seconds is None or seconds < best_seconds:
+            best_seconds = seconds
+    result.seconds = best_seconds
+    result.error = error
+    if java_interpreter is not None:
+        result.instructions = java_interpreter.step_count
+        result.states = java_interpreter.id_generator.id
+        result.peak_frontier = java_interpreter.peak_frontier_size
+
+    # a separate run, tracemalloc slows down the timed ones
+    gc.collect()
+    tracemalloc.start()
+    run_method(java_program, engine, result.class_name, result.method_name)
+    _, result.peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+
+def run_benchmark(
+    engine_name: str = "forking",
+    modes: None | List[AbstractMode] = None,
+    repeat: int = 3,
+) -> List[BenchmarkResult]:
+    """
+    analyse every "@Case" method of every corpus under every abstract mode
+    """
+    if modes is None:
+        modes = list(AbstractMode)
+    engine = ENGINE_DICT[engine_name]
+    old_mode = abstract_interpreter.ABSTRACT_MODE
+    results: List[BenchmarkResult] = []
+    try:
+        for corpus_name, json_directory in CORPUS_LIST:
+            java_program = JavaProgram(corpus_name, json_directory=json_directory)
+            case_names = sorted(java_program.get_case_names())
+            for mode in modes:
+                abstract_interpreter.ABSTRACT_MODE = mode
+                for class_name, method_name in case_names:
+                    result = BenchmarkResult(
+                        engine_name, corpus_name, class_name, method_name, mode
+                    )
+                    benchmark_method(java_program, engine, result, repeat)
+                    results.append(result)
+    finally:
+        abstract_interpreter.ABSTRACT_MODE = old_mode
+    return results
+
+
+def compare_results(
+    results: List[BenchmarkResult],
+    baseline_json: Dict[str, Dict],
+    ratio: float = REGRESSION_RATIO,
+) -> List[str]:
+    """
+    return a line for every result much slower or bigger than the baseline
+    """
+    regressions: List[str] = []
+    for result in results:
+        old_json = baseline_json.get(result.get_key())
+        if old_json is None:
+            continue
+        if result.seconds > MIN_COMPARED_SECONDS and result.seconds > old_json[
+            "seconds"
+        ] * (1 + ratio):
+            regressions.append(
+                f"{result.get_key()}: seconds "
+                f"{old_json['seconds']:.4f} -> {result.seconds:.4f}"
+            )
+        if result.peak_memory > old_json["peak_memory"] * (1 + ratio):
+            regressions.append(
+                f"{result.get_key()}: peak memory "
+                f"{old_json['peak_memory']} -> {result.peak_memory}"
+            )
+        if result.states > old_json["states"] * (1 + ratio):
+            regressions.append(
+                f"{result.get_key()}: states {old_json['states']} -> {result.states}"
+            )
+    return regressions
+
+
+def log_results(results: List[BenchmarkResult]) -> None:
+    print("---benchmark---")
+    print(
+        f"{'method':<60} {'mode':<9} {'instr':>7} {'instr/s':>10} "
+        f"{'states':>7} {'frontier':>8} {'memory':>9} {'seconds':>8}"
+    )
+    for result in results:
+        name = f"{result.corpus_name}:{result.class_name}.{result.method_name}"
+        print(
+            f"{name[-60:]:<60} {result.mode.name:<9} {result.instructions:>7} "
+            f"{result.get_instructions_per_second():>10.0f} {result.states:>7} "
+            f"{result.peak_frontier:>8} {result.peak_memory:>9} "
+            f"{result.seconds:>8.4f}"
+        )
+    for corpus_name, _ in CORPUS_LIST:
+        for mode in AbstractMode:
+            corpus_results = [
+                x for x in results if x.corpus_name == corpus_name and x.mode == mode
+            ]
+            if len(corpus_results) == 0:
+                continue
+            instructions = sum(x.instructions for x in corpus_results)
+            seconds = sum(x.seconds for x in corpus_results)
+            print(
+                f"total {corpus_name} {mode.name}:",
+                "instructions:",
+                instructions,
+                "instructions/s:",
+                round(instructions / seconds) if seconds > 0 else 0,
+                "seconds:",
+                round(seconds, 3),
+            )
+    print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='benchmark the interpreter on every "@Case" method of the corpora'
+    )
+    parser.add_argument("-e", "--engine", choices=ENGINE_DICT.keys(), default="forking")
+    parser.add_argument(
+        "-m",
+        "--mode",
+        action="append",
+        choices=[abstract_mode.name for abstract_mode in AbstractMode],
+        help="the abstract mode to run, may be repeated, all of them by default",
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-s", "--save", help="save the results as the baseline")
+    parser.add_argument("-c", "--compare", help="compare with a saved baseline")
+    parser.add_argument("--ratio", type=float, default=REGRESSION_RATIO)
+    args = parser.parse_args()
+
+    modes = None if args.mode is None else [AbstractMode[x] for x in args.mode]
+    benchmark_results = run_benchmark(args.engine, modes, args.repeat)
+    log_results(benchmark_results)
+
+    if args.save is not None:
+        with open(args.save, "w") as f:
+            json.dump(
+                {x.get_key(): x.to_json() for x in benchmark_results}, f, indent=4
+            )
+    if args.compare is not None:
+        with open(args.compare, "r") as f:
+            regressions = compare_results(benchmark_results, json.load(f), args.ratio)
+        print("---regressions---")
+        for regression in regressions:
+            print(regression)
+        print()
+        if len(regressions) > 0:
+            sys.exit(1)
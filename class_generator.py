@@ -0,0 +1,267 @@
+from __future__ import annotations
+from typing import List
+import argparse
+import json
+import random
+
+from AbstractInterpreter import JSON_CONTENT
+
+# the bytes of each operation in the class file, to give realistic offsets
+OPERATION_SIZE_DICT = {
+    "load": 1,
+    "store": 1,
+    "push": 2,
+    "binary": 1,
+    "if": 3,
+    "ifz": 3,
+    "goto": 3,
+    "incr": 3,
+    "invoke": 3,
+    "return": 1,
+}
+
+CONDITIONS = ["eq", "ne", "lt", "ge", "gt", "le"]
+
+
+def get_int_type_json() -> JSON_CONTENT:
+    return {"base": "int", "annotations": []}
+
+
+class MethodGenerator:
+    """
+    emit a random but well formed int method, the nesting of the statements
+    keeps the operate stack empty between them
+    """
+
+    def __init__(
+        self,
+        class_name: str,
+        method_name: str,
+        size: int,
+        branch_density: float,
+        loop_depth: int,
+        helper_index: int,
+        local_count: int,
+        rng: random.Random,
+    ) -> None:
+        """
+        helper_index: the helper the method calls, 0 for none
+        """
+        self.class_name = class_name
+        self.method_name = method_name
+        self.size = size
+        self.branch_density = branch_density
+        self.loop_depth = loop_depth
+        self.helper_index = helper_index
+        self.local_count = local_count
+        self.rng = rng
+        self.bytecode: List[JSON_CONTENT] = []
+
+    def emit(self, operation_json: JSON_CONTENT) -> int:
+        self.bytecode.append(operation_json)
+        return len(self.bytecode) - 1
+
+    def emit_load(self, index: int) -> None:
+        self.emit({"opr": "load", "type": "int", "index": index})
+
+    def emit_push(self, value: int) -> None:
+        self.emit({"opr": "push", "value": {"type": "integer", "value": value}})
+
+    def emit_store(self, index: int) -> None:
+        self.emit({"opr": "store", "type": "int", "index": index})
+
+    def get_local(self) -> int:
+        return self.rng.randrange(self.local_count)
+
+    def emit_assignment(self) -> None:
+        self.emit_load(self.get_local())
+        operant = self.rng.choice(["add", "add", "sub", "mul", "div", "rem"])
+        if operant in ("div", "rem") and self.rng.random() < 0.8:
+            # mostly a non zero divisor, so few paths end in an exception
+            self.emit_push(self.rng.choice([-3, -2, 2, 3, 7]))
+        elif self.rng.random() < 0.5:
+            self.emit_load(self.get_local())
+        else:
+            self.emit_push(self.rng.randint(-8, 8))
+        self.emit({"opr": "binary", "type": "int", "operant": operant})
+        self.emit_store(self.get_local())
+
+    def emit_call(self) -> None:
+        self.emit_load(self.get_local())
+        self.emit(
+            {
+                "opr": "invoke",
+                "access": "static",
+                "method": {
+                    "is_interface": False,
+                    "ref": {"kind": "class", "name": self.class_name},
+                    "name": f"helper{self.helper_index}",
+                    "args": ["int"],
+                    "returns": "int",
+                },
+            }
+        )
+        self.emit_store(self.get_local())
+
+    def emit_if(self, loop_depth: int, budget: int) -> None:
+        self.emit_load(self.get_local())
+        self.emit_push(self.rng.randint(-4, 4))
+        if_index = self.emit(
+            {"opr": "if", "condition": self.rng.choice(CONDITIONS), "target": None}
+        )
+        self.emit_block(loop_depth, budget // 2)
+        goto_index = self.emit({"opr": "goto", "target": None})
+        self.bytecode[if_index]["target"] = len(self.bytecode)
+        self.emit_block(loop_depth, budget // 2)
+        self.bytecode[goto_index]["target"] = len(self.bytecode)
+
+    def emit_loop(self, loop_depth: int, budget: int) -> None:
+        # count a fresh local down to zero
+        counter_index = self.local_count + loop_depth
+        self.emit_push(self.rng.randint(1, 16))
+        self.emit_store(counter_index)
+        goto_index = self.emit({"opr": "goto", "target": None})
+        body_index = len(self.bytecode)
+        self.emit_block(loop_depth + 1, budget)
+        self.emit({"opr": "incr", "index": counter_index, "amount": -1})
+        self.bytecode[goto_index]["target"] = len(self.bytecode)
+        self.emit_load(counter_index)
+        self.emit({"opr": "ifz", "condition": "gt", "target": body_index})
+
+    def emit_block(self, loop_depth: int, budget: int) -> None:
+        """
+        statements of about budget operations, an `if` or a loop gets a part
+        of the budget for its blocks
+        """
+        end_index = min(len(self.bytecode) + budget, self.size)
+        while len(self.bytecode) < end_index:
+            left = end_index - len(self.bytecode)
+            choice = self.rng.random()
+            if left > 16 and loop_depth < self.loop_depth and choice < 0.15:
+                self.emit_loop(loop_depth, self.rng.randint(4, left - 8))
+            elif left > 12 and choice < 0.15 + self.branch_density:
+                self.emit_if(loop_depth, self.rng.randint(4, left - 8))
+            elif self.helper_index > 0 and choice > 0.95:
+                self.emit_call()
+            else:
+                self.emit_assignment()
+
+    def generate(self, is_case: bool) -> JSON_CONTENT:
+        # the parameter is the first local, the others depend on it,
+        # so the branches are not decided by constants
+        for index in range(1, self.local_count):
+            self.emit_load(0)
+            self.emit_push(self.rng.randint(1, 9))
+            self.emit({"opr": "binary", "type": "int", "operant": "add"})
+            self.emit_store(index)
+        while len(self.bytecode) < self.size:
+            self.emit_block(0, self.rng.randint(16, 128))
+        self.emit_load(self.get_local())
+        self.emit({"opr": "return", "type": "int"})
+
+        offset = 0
+        for operation_json in self.bytecode:
+            operation_json["offset"] = offset
+            offset += OPERATION_SIZE_DICT[operation_json["opr"]]
+
+        annotations = []
+        if is_case:
+            annotations.append(
+                {
+                    "type": "dtu/compute/exec/Case",
+                    "is_runtime_visible": False,
+                    "values": {},
+                }
+            )
+        return {
+            "name": self.method_name,
+            "access": ["public", "static"],
+            "typeparams": [],
+            "params": [
+                {"visible": True, "type": get_int_type_json(), "annotations": []}
+            ],
+            "returns": {"type": {"base": "int"}, "annotations": []},
+            "annotations": annotations,
+            "exceptions": [],
+            "default": None,
+            "code": {
+                "max_stack": 2,
+                "max_locals": self.local_count + self.loop_depth,
+                "exceptions": [],
+                "stack_map": [],
+                "bytecode": self.bytecode,
+            },
+        }
+
+
+def generate_class(
+    class_name: str = "synthetic/Generated",
+    size: int = 1000,
+    branch_density: float = 0.3,
+    loop_depth: int = 2,
+    call_depth: int = 0,
+    local_count: int = 4,
+    seed: int = 0,
+) -> JSON_CONTENT:
+    """
+    a class in the jvm2json format with one "@Case" method `generated`
+    of about size operations, which calls a chain of call_depth helpers
+    """
+    rng = random.Random(seed)
+    methods: List[JSON_CONTENT] = []
+    for depth in range(call_depth + 1):
+        method_generator = MethodGenerator(
+            class_name,
+            "generated" if depth == 0 else f"helper{depth}",
+            # the helpers share the size with the case method
+            size if depth == 0 else max(16, size // (call_depth + 1)),
+            branch_density,
+            loop_depth,
+            # the next helper in the chain, the last one calls nothing
+            depth + 1 if depth < call_depth else 0,
+            local_count,
+            rng,
+        )
+        methods.append(method_generator.generate(depth == 0))
+    return {
+        "name": class_name,
+        "access": ["super"],
+        "typeparams": [],
+        "super": {
+            "name": "java/lang/Object",
+            "inner": None,
+            "args": [],
+            "annotations": [],
+        },
+        "interfaces": [],
+        "fields": [],
+        "methods": methods,
+        "bootstrapmethods": [],
+        "enclosingmethod": None,
+        "innerclasses": [],
+        "annotations": [],
+        "version": [63, 0],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="write a synthetic class in the jvm2json format"
+    )
+    parser.add_argument("output")
+    parser.add_argument("-n", "--size", type=int, default=1000)
+    parser.add_argument("-b", "--branch-density", type=float, default=0.3)
+    parser.add_argument("-l", "--loop-depth", type=int, default=2)
+    parser.add_argument("-c", "--call-depth", type=int, default=0)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    class_json = generate_class(
+        size=args.size,
+        branch_density=args.branch_density,
+        loop_depth=args.loop_depth,
+        call_depth=args.call_depth,
+        seed=args.seed,
+    )
+    with open(args.output, "w") as f:
+        json.dump(class_json, f)
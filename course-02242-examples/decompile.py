@@ -1,16 +1,25 @@
 #!/usr/bin/env python
 
-from glob import glob
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import json
+import os
 import subprocess
 
 classes = Path("target/classes")
 
-for f in classes.glob("**/*.class"):
+
+def decompile(f: Path) -> None:
     result = f.relative_to(classes)
     decompiled = "decompiled" / result.with_suffix("").with_suffix(".json")
     decompiled.parent.mkdir(parents=True, exist_ok=True)
     result = subprocess.check_output(["jvm2json", "-s", f])
-    with open(decompiled, "wb") as df:
-        p = subprocess.Popen(["jq", "."], stdin=subprocess.PIPE, stdout=df)
-        p.communicate(input=result)
+    # pretty print like `jq .` without starting another process
+    with open(decompiled, "w") as df:
+        json.dump(json.loads(result), df, indent=2, ensure_ascii=False)
+        df.write("\n")
+
+
+with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+    for _ in executor.map(decompile, classes.glob("**/*.class")):
+        pass
@@ -0,0 +1,249 @@
+from __future__ import annotations
+from typing import Tuple
+from array import array
+import math
+
+# vectorize the closure when numpy is installed
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INFINITY = math.inf
+# below this dimension the plain loops are faster than numpy calls
+NUMPY_MIN_DIMENSION = 8
+
+
+class DifferenceBoundMatrix:
+    """
+    the constraints x_i - x_j <= c over the variables 0 to size - 1,
+    stored row by row in a flat array of the dimension size + 1,
+    the row and the column 0 are the constant zero, so the entry (i + 1, 0)
+    is the upper bound of x_i and the entry (0, i + 1) its negated lower bound,
+    every operation besides widen and narrow keeps a closed matrix closed
+    """
+
+    __slots__ = ("size", "dimension", "bounds", "is_closed")
+
+    def __init__(self, size: int, bounds: None | array = None) -> None:
+        self.size = size
+        self.dimension = size + 1
+        if bounds is None:
+            bounds = array("d", [INFINITY]) * (self.dimension * self.dimension)
+            for i in range(self.dimension):
+                bounds[i * self.dimension + i] = 0.0
+        self.bounds = bounds
+        self.is_closed = True
+
+    def copy(self) -> DifferenceBoundMatrix:
+        new_matrix = DifferenceBoundMatrix(self.size, self.bounds[:])
+        new_matrix.is_closed = self.is_closed
+        return new_matrix
+
+    def get_key(self) -> Tuple[float, ...]:
+        return tuple(self.bounds)
+
+    def get_view(self):
+        """
+        a numpy view of the bounds, writes go to the array
+        """
+        return numpy.frombuffer(self.bounds, dtype=numpy.float64).reshape(
+            self.dimension, self.dimension
+        )
+
+    def close(self) -> bool:
+        """
+        tighten every bound by the shortest path, Floyd-Warshall,
+        return False if the constraints have no solution
+        """
+        if self.is_closed:
+            return True
+        d = self.dimension
+        bounds = self.bounds
+        if numpy is not None and d >= NUMPY_MIN_DIMENSION:
+            matrix = self.get_view()
+            for k in range(d):
+                numpy.minimum(
+                    matrix, matrix[:, k, None] + matrix[None, k, :], out=matrix
+                )
+        else:
+            for k in range(d):
+                row_k = bounds[k * d : (k + 1) * d]
+                for i in range(d):
+                    bound_ik = bounds[i * d + k]
+                    if bound_ik == INFINITY:
+                        continue
+                    row_i = i * d
+                    for j in range(d):
+                        bound = bound_ik + row_k[j]
+                        if bound < bounds[row_i + j]:
+                            bounds[row_i + j] = bound
+        self.is_closed = True
+        return all(bounds[i * d + i] >= 0 for i in range(d))
+
+    def add_constraint(self, i: int, j: int, c: float) -> bool:
+        """
+        add x_i - x_j <= c to the dimension indexes i and j, 0 is the zero,
+        closed again in quadratic time,
+        return False if the constraints have no solution
+        """
+        if not self.close():
+            return False
+        d = self.dimension
+        bounds = self.bounds
+        if c >= bounds[i * d + j]:
+            return True
+        if bounds[j * d + i] + c < 0:
+            return False
+        if numpy is not None and d >= NUMPY_MIN_DIMENSION:
+            matrix = self.get_view()
+            numpy.minimum(
+                matrix, matrix[:, i, None] + (c + matrix[None, j, :]), out=matrix
+            )
+        else:
+            row_j = bounds[j * d : (j + 1) * d]
+            for k in range(d):
+                bound_ki = bounds[k * d + i]
+                if bound_ki == INFINITY:
+                    continue
+                row_k = k * d
+                for l in range(d):
+                    bound = bound_ki + c + row_j[l]
+                    if bound < bounds[row_k + l]:
+                        bounds[row_k + l] = bound
+        return True
+
+    def add_difference(self, a: int, b: int, c: float) -> bool:
+        """
+        add x_a - x_b <= c
+        """
+        return self.add_constraint(a + 1, b + 1, c)
+
+    def meet_bounds(self, a: int, low: float, high: float) -> bool:
+        """
+        add low <= x_a <= high
+        """
+        return self.add_constraint(a + 1, 0, high) and self.add_constraint(
+            0, a + 1, -low
+        )
+
+    def get_bounds(self, a: int) -> Tuple[float, float]:
+        """
+        the lower and the upper bound of x_a, infinite if unknown
+        """
+        self.close()
+        d = self.dimension
+        return -self.bounds[a + 1], self.bounds[(a + 1) * d]
+
+    def get_difference_bounds(self, a: int, b: int) -> Tuple[float, float]:
+        """
+        the lower and the upper bound of x_a - x_b, infinite if unknown
+        """
+        self.close()
+        d = self.dimension
+        return -self.bounds[(b + 1) * d + a + 1], self.bounds[(a + 1) * d + b + 1]
+
+    def forget(self, a: int) -> None:
+        """
+        drop every constraint on x_a, a closed matrix stays closed
+        """
+        self.close()
+        d = self.dimension
+        i = a + 1
+        bounds = self.bounds
+        for k in range(d):
+            if k != i:
+                bounds[i * d + k] = INFINITY
+                bounds[k * d + i] = INFINITY
+
+    def assign_bounds(self, a: int, low: float, high: float) -> None:
+        """
+        x_a := a value between low and high
+        """
+        self.forget(a)
+        if low > high:
+            return
+        d = self.dimension
+        i = a + 1
+        bounds = self.bounds
+        bounds[i * d] = high
+        bounds[i] = -low
+        # the only paths to x_a go through the zero
+        for k in range(1, d):
+            if k != i:
+                bounds[i * d + k] = high + bounds[k]
+                bounds[k * d + i] = bounds[k * d] - low
+
+    def assign_linear(self, a: int, b: int, c: int) -> None:
+        """
+        x_a := x_b + c
+        """
+        self.close()
+        d = self.dimension
+        i = a + 1
+        j = b + 1
+        bounds = self.bounds
+        if i == j:
+            for k in range(d):
+                if k != i:
+                    bounds[i * d + k] += c
+                    bounds[k * d + i] -= c
+            return
+        for k in range(d):
+            if k != i:
+                bounds[i * d + k] = bounds[j * d + k] + c
+                bounds[k * d + i] = bounds[k * d + j] - c
+        bounds[i * d + j] = c
+        bounds[j * d + i] = -c
+
+    def join(self, b: DifferenceBoundMatrix) -> DifferenceBoundMatrix:
+        """
+        the entry-wise maximum of the closed matrices
+        """
+        x = self if self.is_closed else self.copy()
+        y = b if b.is_closed else b.copy()
+        x.close()
+        y.close()
+        return DifferenceBoundMatrix(
+            self.size, array("d", map(max, x.bounds, y.bounds))
+        )
+
+    def widen(self, b: DifferenceBoundMatrix) -> DifferenceBoundMatrix:
+        """
+        drop the bounds b does not keep, self is not closed before,
+        which would break the termination
+        """
+        y = b if b.is_closed else b.copy()
+        y.close()
+        new_matrix = DifferenceBoundMatrix(
+            self.size,
+            array(
+                "d",
+                (x if z <= x else INFINITY for x, z in zip(self.bounds, y.bounds)),
+            ),
+        )
+        new_matrix.is_closed = False
+        return new_matrix
+
+    def narrow(self, b: DifferenceBoundMatrix) -> DifferenceBoundMatrix:
+        """
+        only refine the bounds the widening dropped
+        """
+        new_matrix = DifferenceBoundMatrix(
+            self.size,
+            array(
+                "d",
+                (z if x == INFINITY else x for x, z in zip(self.bounds, b.bounds)),
+            ),
+        )
+        new_matrix.is_closed = False
+        return new_matrix
+
+    def includes(self, b: DifferenceBoundMatrix) -> bool:
+        """
+        return True if every solution of b is a solution of self
+        """
+        y = b if b.is_closed else b.copy()
+        if not y.close():
+            return True
+        return all(z <= x for x, z in zip(self.bounds, y.bounds))
@@ -1,40 +1,194 @@
 from __future__ import annotations
-from typing import List
+from typing import List, Dict, Iterable, Iterator
 from glob import glob
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import json
 import os
+import re
+import subprocess
+import tempfile
 
+# a faster parser, used when it is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def load_class_files(project_name: str) -> List[str]:
+# the converted json files, named by the hash of the class file and the converter
+CACHE_DIRECTORY = "./.jvm2json_cache"
+# the cache evicts the least recently used files above this size
+CACHE_SIZE_LIMIT = 256 * 1024 * 1024
+CONVERTER_PATH = ".\\jvm2json.exe"
+# jvm2json writes the class name first, so the head of the file is enough
+CLASS_NAME_PATTERN = re.compile(r'^\s*\{\s*"name"\s*:\s*"((?:[^"\\]|\\.)*)"')
+PEEK_SIZE = 4096
+
+
+def get_converter_version(converter_path: str = CONVERTER_PATH) -> str:
+    """
+    the hash of the converter, a new converter invalidates the cache
+    """
+    if not os.path.exists(converter_path):
+        return "missing"
+    with open(converter_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def get_cache_path(
+    class_file_path: str,
+    converter_version: str,
+    cache_directory: str = CACHE_DIRECTORY,
+) -> str:
+    with open(class_file_path, "rb") as f:
+        class_bytes = f.read()
+    key = hashlib.sha256(converter_version.encode() + b"\0" + class_bytes).hexdigest()
+    return os.path.join(cache_directory, f"{key}.json")
+
+
+def convert_class_file(
+    class_file_path: str,
+    converter_version: str,
+    cache_directory: str = CACHE_DIRECTORY,
+    converter_path: str = CONVERTER_PATH,
+) -> str:
+    """
+    convert the class file unless the same bytes were converted before,
+    return the path of the json file in the cache
     """
-    load all the contents of java class files in the project
-    return a list of the json str content
+    json_path = get_cache_path(class_file_path, converter_version, cache_directory)
+    if os.path.exists(json_path):
+        # mark it as recently used
+        os.utime(json_path)
+        return json_path
+
+    os.makedirs(cache_directory, exist_ok=True)
+    # convert to a temporary file of its own, so a failed conversion is never
+    # cached and the threads converting the same bytes do not share a file
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        suffix=".tmp", dir=cache_directory
+    )
+    os.close(file_descriptor)
+    try:
+        subprocess.run(
+            [converter_path, "-s", class_file_path, "-t", temporary_path],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    os.replace(temporary_path, json_path)
+    return json_path
+
+
+def get_cache_size(json_paths: Iterable[str]) -> int:
+    return sum(os.path.getsize(json_path) for json_path in json_paths)
+
+
+def evict_cache(
+    cache_directory: str = CACHE_DIRECTORY, size_limit: int = CACHE_SIZE_LIMIT
+) -> None:
+    """
+    remove the least recently used json files until the cache fits the size limit
+    """
+    if not os.path.isdir(cache_directory):
+        return
+    entries: List[os.DirEntry] = [
+        entry
+        for entry in os.scandir(cache_directory)
+        if entry.is_file() and entry.name.endswith(".json")
+    ]
+    total_size = sum(entry.stat().st_size for entry in entries)
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in entries:
+        if total_size <= size_limit:
+            break
+        total_size -= entry.stat().st_size
+        os.remove(entry.path)
+
+
+def convert_class_files(
+    file_paths: List[str], converter_version: str, max_workers: None | int = None
+) -> Iterator[str]:
     """
+    convert the class files with concurrent converter processes,
+    yield the json paths in the order the conversions finish
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    # the threads only wait for the converter processes
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(convert_class_file, file_path, converter_version)
+            for file_path in file_paths
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def get_class_file_paths(project_name: str) -> List[str]:
     file_paths: List[str] = []
     for file_path in glob("./" + project_name + "/**/*.class", recursive=True):
         file_paths.append(file_path)
+    return file_paths
 
-    # print(file_paths)
 
-    def get_filename(file_path: str) -> str:
-        slash_loc = file_path.rfind("\\")
-        dot_loc = file_path.rfind(".")
-        return file_path[slash_loc + 1 : dot_loc]
+def read_json(json_path: str) -> Dict:
+    """
+    parse a json file, with orjson when it is installed
+    """
+    with open(json_path, "rb") as f:
+        json_bytes = f.read()
+    if orjson is not None:
+        return orjson.loads(json_bytes)
+    return json.loads(json_bytes)
 
-    # the content of the json
-    json_list: List[str] = []
 
-    for file_path in file_paths:
-        json_path = f".\\json\\{get_filename(file_path)}.json"
-        command = f".\\jvm2json.exe -s {file_path} -t {json_path}"
-        os.system(command)
-        with open(json_path, "r") as f:
-            json_list.append(f.read())
+def peek_class_name(json_path: str) -> str:
+    """
+    read the class name without parsing the whole json
+    """
+    with open(json_path, "r") as f:
+        head = f.read(PEEK_SIZE)
+    match = CLASS_NAME_PATTERN.match(head)
+    if match is not None:
+        return json.loads(f'"{match.group(1)}"')
+    return read_json(json_path)["name"]
 
-    return json_list
+
+def index_class_files(
+    project_name: str, max_workers: None | int = None
+) -> Dict[str, str]:
+    """
+    convert the class files in the project without loading them
+    return a dict from the class name to the path of its json
+    """
+    file_paths = get_class_file_paths(project_name)
+    converter_version = get_converter_version()
+
+    path_dict: Dict[str, str] = {}
+    for json_path in convert_class_files(file_paths, converter_version, max_workers):
+        path_dict[peek_class_name(json_path)] = json_path
+
+    # the indexed files must stay until they are loaded
+    evict_cache(size_limit=max(CACHE_SIZE_LIMIT, get_cache_size(path_dict.values())))
+
+    return path_dict
+
+
+def index_json_files(json_directory: str) -> Dict[str, str]:
+    """
+    index the json files converted before, in the directory and below it
+    return a dict from the class name to the path of its json
+    """
+    path_dict: Dict[str, str] = {}
+    for json_path in glob(os.path.join(json_directory, "**", "*.json"), recursive=True):
+        path_dict[peek_class_name(json_path)] = json_path
+    return path_dict
 
 
 # test code
 if __name__ == "__main__":
-    # load_class_files("course-02242-examples")
-    for content in load_class_files("course-02242-examples"):
-        print(content)
\ No newline at end of file
+    for class_name, json_path in index_class_files("course-02242-examples").items():
+        print(class_name, json_path)
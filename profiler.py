@@ -0,0 +1,247 @@
+from __future__ import annotations
+from typing import List, Dict, Tuple, Callable, Iterator
+from contextlib import contextmanager
+import argparse
+import json
+import time
+
+import AbstractInterpreter as abstract_interpreter
+from AbstractInterpreter import (
+    AbstractInterpreter,
+    AbstractMethodStack,
+    AbstractMode,
+    AbstractState,
+    FixpointInterpreter,
+    Instruction,
+    JavaMethod,
+    JavaProgram,
+    Opcode,
+)
+from tracing import TraceLevel, Tracer
+
+
+class ProfileCounter:
+    """
+    the number of executions and the time spent in them
+    """
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+
+    def to_json(self) -> Dict[str, int | float]:
+        return {"count": self.count, "seconds": self.seconds}
+
+
+def get_method_name(java_method: JavaMethod) -> str:
+    return f"{java_method.class_id}.{java_method.id}"
+
+
+class Profiler:
+    """
+    count and time the executed operations by opcode, by offset and by method,
+    nothing is measured outside of profile, so it costs nothing when unused
+    """
+
+    def __init__(self) -> None:
+        self.opcode_dict: Dict[Opcode, ProfileCounter] = {}
+        self.offset_dict: Dict[Tuple[str, int, Opcode], ProfileCounter] = {}
+        self.method_dict: Dict[str, ProfileCounter] = {}
+        # the methods on the stack and the opcode, for flame graphs
+        self.call_stack_dict: Dict[Tuple[str, ...], ProfileCounter] = {}
+        # the number of loops around each offset
+        self.loop_depth_dict: Dict[Tuple[str, int], int] = {}
+        self.fork_count = 0
+        self.copy_count = 0
+
+    def record(
+        self,
+        call_stack: Tuple[str, ...],
+        instruction: Instruction,
+        seconds: float,
+    ) -> None:
+        method_name = call_stack[-1]
+        for counter_dict, key in (
+            (self.opcode_dict, instruction.opcode),
+            (self.offset_dict, (method_name, instruction.offset, instruction.opcode)),
+            (self.method_dict, method_name),
+            (self.call_stack_dict, call_stack + (instruction.opcode.name.lower(),)),
+        ):
+            counter = counter_dict.get(key)
+            if counter is None:
+                counter = ProfileCounter()
+                counter_dict[key] = counter
+            counter.add(seconds)
+
+    def wrap(
+        self,
+        step_function: Callable[
+            [AbstractState, AbstractMethodStack, Instruction], None | AbstractState
+        ],
+    ) -> Callable[
+        [AbstractState, AbstractMethodStack, Instruction], None | AbstractState
+    ]:
+        def profiled_step(
+            state: AbstractState,
+            top_stack: AbstractMethodStack,
+            instruction: Instruction,
+        ) -> None | AbstractState:
+            # read the stack first, the operation may pop it
+            call_stack = tuple(
+                get_method_name(method_stack.program_counter.java_method)
+                for method_stack in state.stack
+            )
+            program_counter = top_stack.program_counter
+            self.loop_depth_dict[
+                (call_stack[-1], instruction.offset)
+            ] = program_counter.java_method.control_flow_graph.get_loop_depth(
+                program_counter.index
+            )
+            start_time = time.perf_counter()
+            try:
+                return step_function(state, top_stack, instruction)
+            finally:
+                self.record(call_stack, instruction, time.perf_counter() - start_time)
+
+        return profiled_step
+
+    @contextmanager
+    def profile(self, java_interpreter: AbstractInterpreter) -> Iterator[Profiler]:
+        """
+        measure the interpreter inside the block, forks and copies are counted
+        for every interpreter while the block runs
+        """
+        old_dispatch_table = java_interpreter.dispatch_table
+        java_interpreter.dispatch_table = [
+            self.wrap(step_function) for step_function in old_dispatch_table
+        ]
+        old_fork = AbstractState.fork
+        old_copy = AbstractMethodStack.copy
+
+        def counted_fork(state: AbstractState, id: int) -> AbstractState:
+            self.fork_count += 1
+            return old_fork(state, id)
+
+        def counted_copy(method_stack: AbstractMethodStack) -> AbstractMethodStack:
+            self.copy_count += 1
+            return old_copy(method_stack)
+
+        AbstractState.fork = counted_fork
+        AbstractMethodStack.copy = counted_copy
+        try:
+            yield self
+        finally:
+            AbstractState.fork = old_fork
+            AbstractMethodStack.copy = old_copy
+            java_interpreter.dispatch_table = old_dispatch_table
+
+    def to_json(self) -> Dict:
+        return {
+            "steps": sum(x.count for x in self.opcode_dict.values()),
+            "seconds": sum(x.seconds for x in self.opcode_dict.values()),
+            "forks": self.fork_count,
+            "copies": self.copy_count,
+            "opcodes": {
+                opcode.name.lower(): counter.to_json()
+                for opcode, counter in sorted(
+                    self.opcode_dict.items(), key=lambda x: -x[1].seconds
+                )
+            },
+            "methods": {
+                method_name: counter.to_json()
+                for method_name, counter in self.method_dict.items()
+            },
+            "offsets": [
+                {
+                    "method": method_name,
+                    "offset": offset,
+                    "opcode": opcode.name.lower(),
+                    "loop_depth": self.loop_depth_dict[(method_name, offset)],
+                    **counter.to_json(),
+                }
+                for (method_name, offset, opcode), counter in sorted(
+                    self.offset_dict.items(), key=lambda x: (x[0][0], x[0][1])
+                )
+            ],
+        }
+
+    def to_collapsed(self) -> str:
+        """
+        one "frame;frame;opcode microseconds" line per call stack,
+        the input format of flamegraph.pl and speedscope
+        """
+        lines: List[str] = []
+        for call_stack, counter in self.call_stack_dict.items():
+            lines.append(f"{';'.join(call_stack)} {round(counter.seconds * 1e6)}")
+        return "\n".join(lines) + "\n"
+
+    def log_report(self) -> None:
+        report_json = self.to_json()
+        print("---profile---")
+        print("steps:", report_json["steps"])
+        print("seconds:", round(report_json["seconds"], 6))
+        print("forks:", self.fork_count)
+        print("copies:", self.copy_count)
+        for opcode_name, counter_json in report_json["opcodes"].items():
+            print(
+                f"  {opcode_name:<12}",
+                f"count: {counter_json['count']:<8}",
+                f"seconds: {counter_json['seconds']:.6f}",
+            )
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="profile the analysis of one method")
+    parser.add_argument("project_name")
+    parser.add_argument("class_name")
+    parser.add_argument("method_name")
+    parser.add_argument(
+        "-j", "--json-directory", help="read the json converted before from here"
+    )
+    parser.add_argument(
+        "-e", "--engine", choices=["forking", "fixpoint"], default="forking"
+    )
+    parser.add_argument(
+        "-m",
+        "--mode",
+        choices=[abstract_mode.name for abstract_mode in AbstractMode],
+        default=abstract_interpreter.ABSTRACT_MODE.name,
+    )
+    parser.add_argument("-l", "--step-limit", type=int, default=1000)
+    parser.add_argument("-o", "--output", help="write the report as json")
+    parser.add_argument(
+        "-f", "--flamegraph", help="write the collapsed stacks for a flame graph"
+    )
+    args = parser.parse_args()
+
+    abstract_interpreter.ABSTRACT_MODE = AbstractMode[args.mode]
+    java_program = JavaProgram(
+        args.project_name,
+        args.class_name,
+        args.method_name,
+        json_directory=args.json_directory,
+    )
+    engine = FixpointInterpreter if args.engine == "fixpoint" else AbstractInterpreter
+    java_interpreter = engine(
+        java_program,
+        java_program.init_method.get_init_parameters(),
+        tracer=Tracer(TraceLevel.OFF),
+    )
+    profiler = Profiler()
+    with profiler.profile(java_interpreter):
+        java_interpreter.run(args.step_limit)
+    profiler.log_report()
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(profiler.to_json(), f, indent=4)
+    if args.flamegraph is not None:
+        with open(args.flamegraph, "w") as f:
+            f.write(profiler.to_collapsed())
@@ -0,0 +1,174 @@
+from __future__ import annotations
+from typing import List, Dict, Tuple
+from glob import glob
+import argparse
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import time
+
+import AbstractInterpreter as abstract_interpreter
+from AbstractInterpreter import JavaClass, JavaProgram, LazyClassDict
+from load_class_files import get_class_file_paths, get_converter_version
+from results_store import get_analyser_version
+
+# bump when the pickled classes change shape
+SNAPSHOT_VERSION = 2
+SNAPSHOT_DIRECTORY = "./.program_snapshots"
+# the snapshot starts with the size of the pickled header
+HEADER_SIZE = struct.Struct("<Q")
+
+
+def get_source_paths(project_name: str, json_directory: None | str = None) -> List[str]:
+    """
+    the files the program is loaded from
+    """
+    if json_directory is None:
+        return sorted(get_class_file_paths(project_name))
+    return sorted(glob(os.path.join(json_directory, "**", "*.json"), recursive=True))
+
+
+def get_fingerprint(source_paths: List[str], is_converted: bool) -> str:
+    """
+    the hash of the size and the modification time of every source file, of
+    the analyser and of its settings, a changed or added or removed file gives
+    a new fingerprint
+    is_converted: the sources are class files, the converter version counts too
+    """
+    fingerprint = hashlib.sha256()
+    fingerprint.update(f"{SNAPSHOT_VERSION}\0{get_analyser_version()}\0".encode())
+    fingerprint.update(
+        f"{abstract_interpreter.PRUNE_DEAD_CODE}\0"
+        f"{abstract_interpreter.SUMMARY_TABLE_SIZE}\0".encode()
+    )
+    if is_converted:
+        fingerprint.update(f"{get_converter_version()}\0".encode())
+    for source_path in source_paths:
+        stat = os.stat(source_path)
+        fingerprint.update(
+            f"{source_path}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode()
+        )
+    return fingerprint.hexdigest()
+
+
+def get_snapshot_path(
+    project_name: str,
+    json_directory: None | str = None,
+    snapshot_directory: str = SNAPSHOT_DIRECTORY,
+) -> str:
+    source = os.path.abspath(project_name if json_directory is None else json_directory)
+    key = hashlib.sha256(source.encode()).hexdigest()
+    return os.path.join(snapshot_directory, f"{key}.pickle")
+
+
+def save_snapshot(
+    java_program: JavaProgram, snapshot_path: str, fingerprint: str
+) -> None:
+    """
+    load every class of the program and write them with the fingerprint,
+    the header is pickled on its own so a stale snapshot is rejected unread
+    """
+    java_class_dict = java_program.java_class_dict
+    class_dict = {name: java_class_dict[name] for name in java_class_dict}
+    path_dict = getattr(java_class_dict, "path_dict", {})
+    header_bytes = pickle.dumps(
+        {"version": SNAPSHOT_VERSION, "fingerprint": fingerprint},
+        pickle.HIGHEST_PROTOCOL,
+    )
+    body_bytes = pickle.dumps((path_dict, class_dict), pickle.HIGHEST_PROTOCOL)
+
+    os.makedirs(os.path.dirname(snapshot_path) or ".", exist_ok=True)
+    temporary_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(HEADER_SIZE.pack(len(header_bytes)))
+        f.write(header_bytes)
+        f.write(body_bytes)
+    os.replace(temporary_path, snapshot_path)
+
+
+def load_snapshot(
+    snapshot_path: str, fingerprint: str
+) -> None | Tuple[Dict[str, str], Dict[str, JavaClass]]:
+    """
+    the path dict and the classes of the snapshot,
+    None when it is missing or made from other sources
+    """
+    if not os.path.exists(snapshot_path) or os.path.getsize(snapshot_path) == 0:
+        return None
+    with open(snapshot_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as snapshot_map:
+            snapshot_view = memoryview(snapshot_map)
+            try:
+                (header_size,) = HEADER_SIZE.unpack_from(snapshot_view)
+                header_end = HEADER_SIZE.size + header_size
+                header_json = pickle.loads(snapshot_view[HEADER_SIZE.size : header_end])
+                if (
+                    header_json["version"] != SNAPSHOT_VERSION
+                    or header_json["fingerprint"] != fingerprint
+                ):
+                    return None
+                return pickle.loads(snapshot_view[header_end:])
+            except Exception:
+                # a truncated or foreign file is only a stale snapshot
+                return None
+            finally:
+                snapshot_view.release()
+
+
+def load_program(
+    project_name: str,
+    init_class_name: None | str = None,
+    init_method_name: None | str = None,
+    json_directory: None | str = None,
+    snapshot_path: None | str = None,
+) -> JavaProgram:
+    """
+    the program from its snapshot when the sources are unchanged,
+    otherwise load it and write a new snapshot
+    """
+    if snapshot_path is None:
+        snapshot_path = get_snapshot_path(project_name, json_directory)
+    fingerprint = get_fingerprint(
+        get_source_paths(project_name, json_directory), json_directory is None
+    )
+    snapshot = load_snapshot(snapshot_path, fingerprint)
+    if snapshot is not None:
+        path_dict, class_dict = snapshot
+        return JavaProgram(
+            project_name,
+            init_class_name,
+            init_method_name,
+            json_directory,
+            LazyClassDict(path_dict, class_dict),
+        )
+
+    java_program = JavaProgram(
+        project_name, init_class_name, init_method_name, json_directory
+    )
+    save_snapshot(java_program, snapshot_path, fingerprint)
+    return java_program
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="write the snapshot of a program, or check that it is fresh"
+    )
+    parser.add_argument("project_name")
+    parser.add_argument(
+        "-j", "--json-directory", help="read the json converted before from here"
+    )
+    parser.add_argument("-o", "--output", help="the path of the snapshot")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    java_program = load_program(
+        args.project_name, json_directory=args.json_directory, snapshot_path=args.output
+    )
+    print(
+        "classes:",
+        len(java_program.java_class_dict),
+        "seconds:",
+        round(time.perf_counter() - start_time, 4),
+    )
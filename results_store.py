@@ -0,0 +1,142 @@
+from __future__ import annotations
+from typing import List, Dict, Tuple, Set, Any
+import hashlib
+import json
+import os
+
+import AbstractInterpreter as abstract_interpreter
+import difference_bound_matrix
+import load_class_files
+from AbstractInterpreter import AbstractMode, JavaMethod, JavaProgram, Opcode
+
+# bump when the stored results change meaning
+STORE_VERSION = 1
+# the modules whose source decides the loaded classes and the results
+ANALYSER_MODULES = [abstract_interpreter, difference_bound_matrix, load_class_files]
+
+
+def get_analyser_version() -> str:
+    """
+    the hash of the analyser sources, a changed analysis invalidates the store
+    """
+    analyser_version = hashlib.sha256()
+    for module in ANALYSER_MODULES:
+        with open(module.__file__, "rb") as f:
+            analyser_version.update(f.read())
+    return analyser_version.hexdigest()
+
+
+def get_config_json(abstract_mode: AbstractMode, engine_name: str) -> Dict[str, Any]:
+    """
+    everything besides the bytecode which changes the result of an analysis
+    """
+    return {
+        "version": STORE_VERSION,
+        "analyser": get_analyser_version(),
+        "engine": engine_name,
+        "abstract_mode": abstract_mode.value,
+        "call_depth_limit": abstract_interpreter.CALL_DEPTH_LIMIT,
+        "prune_dead_code": abstract_interpreter.PRUNE_DEAD_CODE,
+        "summary_table_size": abstract_interpreter.SUMMARY_TABLE_SIZE,
+    }
+
+
+def get_callees(
+    java_program: JavaProgram, java_method: JavaMethod
+) -> Tuple[List[JavaMethod], List[str]]:
+    """
+    the methods of the program the method invokes statically,
+    and the names of the invoked methods outside the program
+    """
+    callees: List[JavaMethod] = []
+    external_names: List[str] = []
+    for instruction in java_method.instructions:
+        if instruction.opcode != Opcode.INVOKE or instruction.type != "static":
+            continue
+        class_name, arg_types, _ = instruction.method
+        if class_name not in java_program.java_class_dict:
+            external_names.append(f"{class_name}.{instruction.name}")
+            continue
+        java_class = java_program.java_class_dict[class_name]
+        callees.append(java_class.get_method(instruction.name, arg_types))
+    return callees, external_names
+
+
+def get_bytecode_hash(java_method: JavaMethod) -> str:
+    bytecode_str = json.dumps(java_method.bytecode_json, sort_keys=True)
+    return hashlib.sha256(bytecode_str.encode()).hexdigest()
+
+
+def get_method_key(
+    java_program: JavaProgram, java_method: JavaMethod, config_json: Dict[str, Any]
+) -> str:
+    """
+    the hash of the bytecode of the method and every method it may call,
+    a change in any of them gives a new key
+    """
+    method_hash_dict: Dict[Tuple, str] = {}
+    external_name_set: Set[str] = set()
+    method_list = [java_method]
+    while len(method_list) > 0:
+        method = method_list.pop()
+        method_id = (method.class_id, method.id, method.get_arg_types())
+        if method_id in method_hash_dict:
+            continue
+        method_hash_dict[method_id] = get_bytecode_hash(method)
+        callees, external_names = get_callees(java_program, method)
+        method_list += callees
+        external_name_set.update(external_names)
+
+    key_json = {
+        "config": config_json,
+        "method": [java_method.class_id, java_method.id],
+        "methods": sorted([list(k), v] for k, v in method_hash_dict.items()),
+        "external": sorted(external_name_set),
+    }
+    key_str = json.dumps(key_json, sort_keys=True)
+    return hashlib.sha256(key_str.encode()).hexdigest()
+
+
+class ResultsStore:
+    """
+    the results of earlier analyses in a json file, keyed by the method keys
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.result_dict: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self.result_dict = json.load(f)
+        # the keys read or written since loading
+        self.used_key_set: Set[str] = set()
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def get(self, key: str) -> None | Dict[str, Any]:
+        self.used_key_set.add(key)
+        result_json = self.result_dict.get(key)
+        if result_json is None:
+            self.miss_count += 1
+        else:
+            self.hit_count += 1
+        return result_json
+
+    def put(self, key: str, result_json: Dict[str, Any]) -> None:
+        self.used_key_set.add(key)
+        self.result_dict[key] = result_json
+
+    def save(self, prune: bool = False) -> None:
+        """
+        prune: drop the results not used since loading
+        """
+        if prune:
+            self.result_dict = {
+                key: result_json
+                for key, result_json in self.result_dict.items()
+                if key in self.used_key_set
+            }
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(self.result_dict, f)
+        os.replace(temporary_path, self.path)
@@ -0,0 +1,187 @@
+from __future__ import annotations
+from typing import List, Dict
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import AbstractInterpreter as abstract_interpreter
+from AbstractInterpreter import AbstractMode, JavaProgram, SpillScheduler
+from benchmark import ENGINE_DICT, STEP_LIMIT
+from class_generator import generate_class
+from tracing import TraceLevel, Tracer
+
+DEFAULT_SIZES = [100, 200, 400, 800, 1600, 3200, 6400]
+# the width of the bars of the plot
+PLOT_WIDTH = 50
+
+
+def measure_size(
+    java_program: JavaProgram,
+    engine_name: str,
+    step_limit: None | int,
+    memory_limit: None | int = None,
+) -> Dict[str, float | int | None | str]:
+    """
+    one timed run and one run under tracemalloc of the generated method,
+    without a step limit the fixpoint engine runs to the fixpoint
+    memory_limit: the bytes of the frontier and the state index of the forking
+    engine, the frontier spills to disk over its half, unbounded by default
+    """
+    engine = ENGINE_DICT[engine_name]
+    if step_limit is None and engine_name == "forking":
+        step_limit = STEP_LIMIT
+    row: Dict[str, float | int | None | str] = {}
+    for is_traced in (False, True):
+        java_program.summary_table = abstract_interpreter.SummaryTable()
+        scheduler_kwargs = {}
+        if memory_limit is not None and engine_name == "forking":
+            scheduler_kwargs["scheduler"] = SpillScheduler(memory_limit)
+        java_interpreter = engine(
+            java_program,
+            java_program.init_method.get_init_parameters(),
+            tracer=Tracer(TraceLevel.OFF),
+            **scheduler_kwargs,
+        )
+        gc.collect()
+        if is_traced:
+            tracemalloc.start()
+        start_time = time.perf_counter()
+        error = None
+        try:
+            java_interpreter.run(step_limit)
+        except Exception as exception:
+            error = repr(exception)
+        seconds = time.perf_counter() - start_time
+        if is_traced:
+            _, row["peak_memory"] = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        else:
+            row["seconds"] = seconds
+            row["instructions"] = java_interpreter.step_count
+            row["states"] = java_interpreter.id_generator.id
+            row["peak_frontier"] = java_interpreter.peak_frontier_size
+            row["error"] = error
+    return row
+
+
+def run_scaling(
+    sizes: List[int],
+    engine_name: str = "fixpoint",
+    mode: AbstractMode = AbstractMode.SIGN,
+    step_limit: None | int = None,
+    branch_density: float = 0.3,
+    loop_depth: int = 2,
+    call_depth: int = 0,
+    seed: int = 0,
+    memory_limit: None | int = None,
+) -> List[Dict[str, float | int | None | str]]:
+    """
+    generate a class of each size and analyse its method
+    """
+    old_mode = abstract_interpreter.ABSTRACT_MODE
+    abstract_interpreter.ABSTRACT_MODE = mode
+    rows: List[Dict[str, float | int | None | str]] = []
+    try:
+        with tempfile.TemporaryDirectory() as json_directory:
+            for size in sizes:
+                class_json = generate_class(
+                    size=size,
+                    branch_density=branch_density,
+                    loop_depth=loop_depth,
+                    call_depth=call_depth,
+                    seed=seed,
+                )
+                # a directory per size, the classes have the same name
+                size_directory = os.path.join(json_directory, str(size))
+                os.mkdir(size_directory)
+                with open(os.path.join(size_directory, "Generated.json"), "w") as f:
+                    json.dump(class_json, f)
+                java_program = JavaProgram(
+                    "synthetic",
+                    class_json["name"],
+                    "generated",
+                    json_directory=size_directory,
+                )
+                row = {
+                    "size": len(java_program.init_method.instructions),
+                    **measure_size(java_program, engine_name, step_limit, memory_limit),
+                }
+                rows.append(row)
+    finally:
+        abstract_interpreter.ABSTRACT_MODE = old_mode
+    return rows
+
+
+def to_csv(rows: List[Dict[str, float | int | None | str]]) -> str:
+    columns = list(rows[0].keys())
+    lines = [",".join(columns)]
+    for row in rows:
+        lines.append(",".join("" if row[x] is None else str(row[x]) for x in columns))
+    return "\n".join(lines) + "\n"
+
+
+def plot(rows: List[Dict[str, float | int | None | str]], column: str) -> str:
+    """
+    a horizontal bar per size, scaled to the largest value
+    """
+    largest = max(row[column] for row in rows) or 1
+    lines = [f"{column} by size"]
+    for row in rows:
+        bar = "#" * round(PLOT_WIDTH * row[column] / largest)
+        lines.append(f"{row['size']:>7} | {bar} {row[column]:.4g}")
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="analyse generated methods of growing size"
+    )
+    parser.add_argument("-n", "--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "-e", "--engine", choices=ENGINE_DICT.keys(), default="fixpoint"
+    )
+    parser.add_argument(
+        "-m",
+        "--mode",
+        choices=[abstract_mode.name for abstract_mode in AbstractMode],
+        default=abstract_interpreter.ABSTRACT_MODE.name,
+    )
+    parser.add_argument("-l", "--step-limit", type=int, default=None)
+    parser.add_argument("-b", "--branch-density", type=float, default=0.3)
+    parser.add_argument("-d", "--loop-depth", type=int, default=2)
+    parser.add_argument("-c", "--call-depth", type=int, default=0)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument(
+        "-M",
+        "--memory-limit",
+        type=int,
+        default=None,
+        help="bound the frontier and the state index of the forking engine by these"
+        " bytes, the frontier spills to disk",
+    )
+    parser.add_argument("-o", "--output", help="write the results as csv")
+    args = parser.parse_args()
+
+    scaling_rows = run_scaling(
+        args.sizes,
+        args.engine,
+        AbstractMode[args.mode],
+        args.step_limit,
+        args.branch_density,
+        args.loop_depth,
+        args.call_depth,
+        args.seed,
+        args.memory_limit,
+    )
+    csv_str = to_csv(scaling_rows)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            f.write(csv_str)
+    else:
+        print(csv_str)
+    print(plot(scaling_rows, "seconds"))
+    print(plot(scaling_rows, "peak_memory"))
@@ -0,0 +1,101 @@
+from __future__ import annotations
+from typing import List, Dict, Any, TextIO
+from enum import IntEnum
+import json
+import sys
+
+
+class TraceLevel(IntEnum):
+    OFF = 0
+    # the start and the results of a run
+    SUMMARY = 1
+    # every new and final state
+    STATE = 2
+    # every executed instruction
+    INSTRUCTION = 3
+
+
+# the level of a tracer created without one, the full trace as before
+TRACE_LEVEL = TraceLevel.INSTRUCTION
+
+# the number of characters buffered before a sink writes them out
+BUFFER_SIZE = 1 << 16
+
+
+class TextSink:
+    """
+    write the trace as readable text
+    """
+
+    def __init__(self, stream: None | TextIO = None, buffer_size: int = BUFFER_SIZE):
+        # None is the current stdout, looked up when the buffer is written
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.buffer: List[str] = []
+        self.size = 0
+
+    def write(self, event: str, text: str, fields: Dict[str, Any]) -> None:
+        self.buffer.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if len(self.buffer) == 0:
+            return
+        stream = sys.stdout if self.stream is None else self.stream
+        stream.write("\n".join(self.buffer) + "\n")
+        stream.flush()
+        self.buffer.clear()
+        self.size = 0
+
+    def close(self) -> None:
+        self.flush()
+
+
+class JsonLinesSink:
+    """
+    write one json object per event, for tools reading the trace
+    """
+
+    def __init__(self, path: str, buffer_size: int = BUFFER_SIZE):
+        self.file = open(path, "w", buffering=buffer_size)
+
+    def write(self, event: str, text: str, fields: Dict[str, Any]) -> None:
+        self.file.write(json.dumps({"event": event, **fields}) + "\n")
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class Tracer:
+    """
+    send the events up to the level to the sinks,
+    callers check the level before formatting anything
+    """
+
+    def __init__(
+        self,
+        level: None | TraceLevel = None,
+        sinks: None | List[TextSink | JsonLinesSink] = None,
+    ) -> None:
+        self.level = TRACE_LEVEL if level is None else level
+        self.sinks = [TextSink()] if sinks is None else sinks
+
+    def is_enabled(self, level: TraceLevel) -> bool:
+        return level <= self.level
+
+    def emit(self, event: str, message: str, **fields: Any) -> None:
+        for sink in self.sinks:
+            sink.write(event, message, fields)
+
+    def flush(self) -> None:
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()